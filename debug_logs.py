@@ -32,17 +32,18 @@ try:
     print(f"Log file exists according to module path: {os.path.exists(LOG_FILE_PATH)}")
     
     # Check current state of communication_logs
-    print(f"Current communication_logs: {len(communication_logs)} entries")
+    print(f"Current communication_logs: {len(communication_logs())} entries")
     
     # Try loading logs
     print("Calling load_logs_from_file()...")
     load_logs_from_file()
     
     # Check if logs were loaded
-    print(f"After loading, communication_logs has {len(communication_logs)} entries")
+    logs = communication_logs()
+    print(f"After loading, communication_logs has {len(logs)} entries")
     
-    if len(communication_logs) > 0:
-        print(f"First log entry type: {communication_logs[0].get('message_type', 'unknown')}")
+    if len(logs) > 0:
+        print(f"First log entry type: {logs[0].get('message_type', 'unknown')}")
     
 except Exception as e:
     print(f"Module import error: {e}")
@@ -14,7 +14,6 @@ import asyncio
 from typing import Dict, List, Any, Optional, Union
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
 import uvicorn
 from pydantic import BaseModel, Field
 
@@ -23,7 +22,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.monitor_agent import DevelopmentMonitorAgent
-from src.web_interface import add_to_logs, get_html_interface
+from src.web_interface import add_to_logs
 from src.tdd_helpers import handle_tdd_request, create_tdd_test_prompt, cleanup_generated_tests, set_agent
 from src.tdd_evaluator import evaluate_tdd_results, combine_evaluation_results
 
@@ -392,6 +391,12 @@ async def process_tdd_request(tdd_request, code, language):
         class VirtualWebSocket:
             async def send_text(self, text):
                 self.response = json.loads(text)
+
+            async def send_json(self, data):
+                self.response = data
+
+            async def send_bytes(self, data):
+                self.response = json.loads(data)
         
         virtual_ws = VirtualWebSocket()
         
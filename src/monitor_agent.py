@@ -12,7 +12,7 @@ import json
 import logging
 import requests
 import datetime
-from typing import Dict, List, Optional, Union, Any, Tuple
+from typing import Callable, Dict, List, Optional, Union, Any, Tuple
 
 # Configure logging
 logging.basicConfig(
@@ -309,7 +309,77 @@ class DevelopmentMonitorAgent:
                 "system_cpu": cpu,
                 "system_mem": mem
             }
-    
+
+    def stream_prompt_to_llm(self, prompt: str, on_chunk: Callable[[str], None]) -> Dict[str, Any]:
+        """
+        Send a prompt to the connected LLM and stream the response as it is generated.
+        Args:
+            prompt: The prompt to send to the LLM
+            on_chunk: Called with each piece of response text as it arrives
+        Returns:
+            Dict containing the full LLM response and metadata (same shape as send_prompt_to_llm)
+        """
+        if not self.llm_client:
+            logger.warning("LLM client not connected. Connect first with connect_llm()")
+            return {"error": "LLM client not connected"}
+
+        import time
+        logger.info("Streaming prompt to Ollama...")
+        prompt = self._truncate_prompt_to_context_window(prompt)
+        start_time = time.time()
+        try:
+            url = f"{self.llm_client['endpoint']}/api/generate"
+            data = {
+                "model": self.llm_client["model"],
+                "prompt": prompt,
+                "stream": True
+            }
+            chunks = []
+            final_data = {}
+            with requests.post(url, headers=self.llm_client["headers"], json=data, timeout=180, stream=True) as response:
+                if response.status_code != 200:
+                    elapsed = time.time() - start_time
+                    logger.error(f"Failed to get response from Ollama. Status code: {response.status_code}")
+                    return {
+                        "success": False,
+                        "error": f"API error: {response.status_code}",
+                        "response": response.text,
+                        "llm_request_time": elapsed
+                    }
+                # Ollama streams one JSON object per line; the last one has "done": true
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    line_data = json.loads(line)
+                    text = line_data.get("response", "")
+                    if text:
+                        chunks.append(text)
+                        on_chunk(text)
+                    if line_data.get("done"):
+                        final_data = line_data
+                        break
+            elapsed = time.time() - start_time
+            logger.info(f"LLM streaming request completed in {elapsed:.2f} seconds")
+            return {
+                "success": True,
+                "response": "".join(chunks),
+                "model": self.llm_client["model"],
+                "metadata": {
+                    "eval_count": final_data.get("eval_count", 0),
+                    "eval_duration": final_data.get("eval_duration", 0),
+                    "llm_request_time": elapsed
+                }
+            }
+        except Exception as e:
+            elapsed = time.time() - start_time
+            logger.error(f"Error streaming prompt to Ollama: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "response": None,
+                "llm_request_time": elapsed
+            }
+
     def capture_and_analyze_output(self, ai_output: str, expected_behavior: str) -> Dict[str, Any]:
         """
         Capture the AI's output and analyze it for hallucinations or inaccuracies.
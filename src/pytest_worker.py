@@ -0,0 +1,162 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Edwin Barczyński
+
+"""
+Persistent pytest worker
+
+Long-lived helper process used by the test execution module so that TDD
+iterations don't pay for interpreter start-up and pytest plugin discovery on
+every run. It reads one JSON job per line on stdin and answers with one JSON
+result per line on stdout:
+
+    {"test_file": "/tmp/.../test.py", "work_dir": "/tmp/..."}
+    {"exit_code": 0, "passed": 3, "failed": 0, "errors": 0, "output": "...", "recycle": false}
+
+The pass/fail counts come straight from pytest's test reports, one outcome
+per test, so callers don't have to parse them back out of the output.
+"errors" counts collection errors, which aren't tests.
+
+Test code runs inside this interpreter, so each job's changes to the working
+directory, sys.path, os.environ and the modules imported from its work
+directory are undone afterwards. Anything else a job leaves behind, such as a
+replaced module or a rebound module global, can't be undone reliably; the
+worker then answers with "recycle": true and exits, and the caller starts a
+fresh one for the next job.
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+# Bound now, so test code that patches the json module can't corrupt the protocol
+from json import dumps as _dumps, loads as _loads
+
+_MISSING = object()
+
+
+def _purge_modules(work_dir: str):
+    """Drop modules imported from a job's work directory so the next job starts clean"""
+    for name, module in list(sys.modules.items()):
+        module_file = getattr(module, "__file__", None) or ""
+        if module_file.startswith(work_dir):
+            del sys.modules[name]
+
+
+def _restore_environ(saved: dict):
+    """Undo a job's changes to os.environ"""
+    for key in list(os.environ):
+        if key not in saved:
+            del os.environ[key]
+    for key, value in saved.items():
+        if os.environ.get(key) != value:
+            os.environ[key] = value
+
+
+def _snapshot_globals() -> dict:
+    """Record every loaded module and the objects its globals are bound to"""
+    return {
+        name: (module, dict(module.__dict__))
+        for name, module in list(sys.modules.items())
+        if getattr(module, "__dict__", None) is not None
+    }
+
+
+def _globals_modified(snapshot: dict) -> bool:
+    """Whether modules in the snapshot were removed or replaced, or had globals rebound or deleted"""
+    for name, (module, saved_globals) in snapshot.items():
+        if sys.modules.get(name) is not module:
+            return True
+        current_globals = module.__dict__
+        for key, value in saved_globals.items():
+            if current_globals.get(key, _MISSING) is not value:
+                return True
+    return False
+
+
+class _OutcomeCounter:
+    """pytest plugin that records one outcome per test, and collection errors separately"""
+    def __init__(self):
+        self.outcomes = {}
+        self.errors = 0
+
+    @property
+    def passed(self) -> int:
+        return sum(1 for outcome in self.outcomes.values() if outcome == "passed")
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for outcome in self.outcomes.values() if outcome == "failed")
+
+    def pytest_collectreport(self, report):
+        # A test file that fails to import runs no tests at all
+        if report.failed:
+            self.errors += 1
+
+    def pytest_runtest_logreport(self, report):
+        # Setup, call and teardown are reported separately: a test fails if
+        # any phase failed, and passes only if its call passed
+        if report.failed:
+            self.outcomes[report.nodeid] = "failed"
+        elif report.passed and report.when == "call" and report.nodeid not in self.outcomes:
+            self.outcomes[report.nodeid] = "passed"
+
+
+def run_job(job: dict) -> dict:
+    """Run pytest for a single job and return its exit code, test counts and combined output"""
+    import pytest
+
+    work_dir = job["work_dir"]
+    saved_cwd = os.getcwd()
+    saved_path = list(sys.path)
+    saved_environ = dict(os.environ)
+    snapshot = _snapshot_globals()
+    output = io.StringIO()
+    counter = _OutcomeCounter()
+    try:
+        os.chdir(work_dir)
+        sys.path.insert(0, work_dir)
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            exit_code = int(pytest.main([job["test_file"], "-v", "-p", "no:cacheprovider"], plugins=[counter]))
+    except Exception as e:
+        output.write(f"Error running pytest worker job: {e}\n")
+        exit_code = -1
+    finally:
+        os.chdir(saved_cwd)
+        sys.path[:] = saved_path
+        _restore_environ(saved_environ)
+        _purge_modules(work_dir)
+    return {
+        "exit_code": exit_code,
+        "passed": counter.passed,
+        "failed": counter.failed,
+        "errors": counter.errors,
+        "output": output.getvalue(),
+        "recycle": _globals_modified(snapshot)
+    }
+
+
+def main():
+    """Serve jobs until stdin is closed"""
+    # Keep a private handle on the real stdout for the protocol; anything the
+    # tests print at fd level must not corrupt the response stream
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    # pytest sets the temp directory lazily on its first run; set it up front
+    # so the first job isn't mistaken for one that changed global state
+    tempfile.gettempdir()
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            result = run_job(_loads(line))
+        except Exception as e:
+            result = {"exit_code": -1, "output": f"Invalid pytest worker job: {e}"}
+        protocol_out.write(_dumps(result) + "\n")
+        protocol_out.flush()
+        if result.get("recycle"):
+            break
+
+
+if __name__ == "__main__":
+    main()
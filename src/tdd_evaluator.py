@@ -13,11 +13,51 @@ from typing import Dict, List, Tuple, Any
 from src.task_relevance import assess_task_relevance
 from src.task_analyzer import analyze_task_for_testing
 from src.test_quality_metrics import evaluate_test_quality
-from src.test_execution import execute_tests, document_test_results, TestExecutionResult
+from src.test_execution import execute_tests_batch, document_test_results, TestExecutionResult
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Indicator words looked up against the tokenized test code (case-insensitive)
+ERROR_INDICATORS = (
+    "raises", "raise", "exception", "Error", "error",
+    "fail", "invalid", "incorrect", "wrong", "exception",
+    "panic", "throw", "throws"
+)
+PERFORMANCE_INDICATORS = (
+    "performance", "timeout", "slow", "optimize",
+    "efficient", "complexity", "stack overflow", "memory leak"
+)
+POSITIVE_INDICATORS = (
+    "complete", "comprehensive", "robust", "reliable",
+    "correct", "accurate", "proper", "good", "successful", "passes"
+)
+
+_WORD_SPLIT_RE = re.compile(r'\W+')
+
+# Multi-word indicators can't be answered from the token set, so they keep a regex
+_PHRASE_INDICATOR_RES = {
+    indicator: re.compile(rf'\b{indicator}\b', re.IGNORECASE)
+    for indicator in ERROR_INDICATORS + PERFORMANCE_INDICATORS + POSITIVE_INDICATORS
+    if " " in indicator
+}
+
+def _tokenize(code: str) -> set:
+    """Split code into a set of lowercase word tokens"""
+    return set(_WORD_SPLIT_RE.split(code.lower()))
+
+def _matching_indicators(indicators, tokens: set, code: str) -> List[str]:
+    """Return the indicators (in order) that appear as whole words in the code"""
+    hits = []
+    for indicator in indicators:
+        phrase_re = _PHRASE_INDICATOR_RES.get(indicator)
+        if phrase_re is not None:
+            if phrase_re.search(code):
+                hits.append(indicator)
+        elif indicator.lower() in tokens:
+            hits.append(indicator)
+    return hits
+
 def evaluate_tdd_results(tdd_tests: List[Dict[str, Any]], suggestion_code: str, task_description: str) -> Dict[str, Any]:
     """
     Evaluate TDD test results and determine if they indicate the suggestion should be accepted
@@ -53,6 +93,9 @@ def evaluate_tdd_results(tdd_tests: List[Dict[str, Any]], suggestion_code: str,
     # Track test execution results
     test_execution_results = []
 
+    # Stripped code and tokens per iteration, reused for the final assessment
+    stripped_by_iteration = {}
+
     def strip_comments_and_docstrings(code: str) -> str:
         # Remove Python and JS comments and docstrings for more accurate analysis
         code = re.sub(r'""".*?"""|\'\'\'.*?\'\'\'|//.*?$|/\*.*?\*/', '', code, flags=re.DOTALL | re.MULTILINE)
@@ -76,8 +119,19 @@ def evaluate_tdd_results(tdd_tests: List[Dict[str, Any]], suggestion_code: str,
                 detected_language = lang_pattern[1]
                 break
     
+    # Run the tests of every iteration up front, in parallel
+    execution_jobs = {}
+    if detected_language:
+        for index, test_result in enumerate(tdd_tests):
+            test_code = test_result.get("test_code", "")
+            implementation_code = test_result.get("implementation_code", suggestion_code)
+            if test_code and implementation_code:
+                execution_jobs[index] = (test_code, implementation_code, detected_language,
+                                         test_result.get("iteration", 0), task_description)
+    execution_outcomes = dict(zip(execution_jobs, execute_tests_batch(list(execution_jobs.values()))))
+    
     # Analyze test content for each iteration
-    for test_result in tdd_tests:
+    for index, test_result in enumerate(tdd_tests):
         test_code = test_result.get("test_code", "")
         implementation_code = test_result.get("implementation_code", suggestion_code)
         iteration = test_result.get("iteration", 0)
@@ -116,16 +170,11 @@ def evaluate_tdd_results(tdd_tests: List[Dict[str, Any]], suggestion_code: str,
         test_count = max(test_func_count, assert_count)
         
         # Execute the tests if we have both test code and implementation code
-        if test_code and implementation_code and detected_language:
+        if index in execution_outcomes:
             try:
-                logger.info(f"Executing tests for iteration {iteration}")
-                execution_result = execute_tests(
-                    test_code, 
-                    implementation_code, 
-                    detected_language, 
-                    iteration,
-                    task_description
-                )
+                execution_result = execution_outcomes[index]
+                if isinstance(execution_result, Exception):
+                    raise execution_result
                 
                 # Document the test results
                 test_doc = document_test_results(
@@ -175,40 +224,25 @@ def evaluate_tdd_results(tdd_tests: List[Dict[str, Any]], suggestion_code: str,
             passed_tests += test_count
 
         # Check for error indicators in the tests (excluding comments)
-        error_indicators = [
-            "raises", "raise", "exception", "Error", "error", 
-            "fail", "invalid", "incorrect", "wrong", "exception",
-            "panic", "throw", "throws"
-        ]
-        for indicator in error_indicators:
-            # Only match outside comments/docstrings
-            if re.search(rf'\b{indicator}\b', code_no_comments, re.IGNORECASE):
-                # Only add if not already counted as a fail
-                issues_detected.append(f"Potential issue in iteration {iteration}: {indicator}")
+        tokens = _tokenize(code_no_comments)
+        stripped_by_iteration.setdefault(iteration, (code_no_comments, tokens))
+        for indicator in _matching_indicators(ERROR_INDICATORS, tokens, code_no_comments):
+            issues_detected.append(f"Potential issue in iteration {iteration}: {indicator}")
 
         # For later iterations (3+), look for performance concerns
         if iteration >= 3:
-            performance_indicators = [
-                "performance", "timeout", "slow", "optimize", 
-                "efficient", "complexity", "stack overflow", "memory leak"
-            ]
-            for indicator in performance_indicators:
-                if re.search(rf'\b{indicator}\b', code_no_comments, re.IGNORECASE):
-                    issues_detected.append(f"Performance concern identified in iteration {iteration}: {indicator}")
+            for indicator in _matching_indicators(PERFORMANCE_INDICATORS, tokens, code_no_comments):
+                issues_detected.append(f"Performance concern identified in iteration {iteration}: {indicator}")
 
     # For the last iteration (max_iteration), check overall assessment
     final_tests = [t for t in tdd_tests if t.get("iteration", 0) == max_iteration]
+    final_code = final_tests[0].get("test_code", "") if final_tests else ""
     if final_tests:
-        final_code = final_tests[0].get("test_code", "")
-        code_no_comments = strip_comments_and_docstrings(final_code)
+        # The final iteration's code was already stripped in the loop above
+        code_no_comments, tokens = stripped_by_iteration[max_iteration]
         # Check for positive indicators in the final assessment
-        positive_indicators = [
-            "complete", "comprehensive", "robust", "reliable", 
-            "correct", "accurate", "proper", "good", "successful", "passes"
-        ]
-        for indicator in positive_indicators:
-            if re.search(rf'\b{indicator}\b', code_no_comments, re.IGNORECASE):
-                recommendations.append(f"Final assessment indicates code is {indicator}")
+        for indicator in _matching_indicators(POSITIVE_INDICATORS, tokens, code_no_comments):
+            recommendations.append(f"Final assessment indicates code is {indicator}")
 
     # Calculate task relevance
     task_relevance = assess_task_relevance(tdd_tests, suggestion_code, task_description)
@@ -246,7 +280,6 @@ def evaluate_tdd_results(tdd_tests: List[Dict[str, Any]], suggestion_code: str,
     quality_score = 0.5  # Default quality score
     
     if final_tests:
-        final_code = final_tests[0].get("test_code", "")
         test_quality = evaluate_test_quality(
             final_code, 
             task_description, 
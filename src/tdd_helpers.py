@@ -7,18 +7,39 @@ TDD Helpers for MCP Server
 This module provides helper functions for handling Test-Driven Development
 requests in the MCP server.
 """
-import json
+import asyncio
+import concurrent.futures
 import logging
-from typing import Dict, Any, Optional, Union
-from fastapi import WebSocket
-from pydantic import BaseModel
+import os
+import re
+import sys
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple, Union
 from src.language_test_templates import get_language_specific_template
 from src.enhanced_tdd_templates import enhance_tdd_prompt, get_enhanced_fallback_tests
 from src.adaptive_test_generation import enhance_test_prompt_with_adaptive_strategy
 
-# Import from MCP server
-# These need to be imported here to avoid circular imports
-from src.web_interface import add_to_logs
+# FastAPI is only needed for type hints; the web interface logger is imported
+# lazily inside handle_tdd_request so CLI paths don't pay for it at import time
+if TYPE_CHECKING:
+    from fastapi import WebSocket
+
+# orjson is optional: it serializes straight to bytes and is much faster on
+# the multi-KB generated test payloads
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# msgspec is preferred when installed; its C encoder is faster still on the
+# nested response dicts. One Encoder is reused for every message
+try:
+    import msgspec
+    _msgspec_encoder = msgspec.json.Encoder()
+except ImportError:
+    msgspec = None
+    _msgspec_encoder = None
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -37,43 +58,168 @@ DEFAULT_MAX_ITERATIONS = 5
 # Forward references for type hints
 MCPMessage = Any  # This will be replaced with the actual import at runtime
 
+# Markdown code fence markers (with optional language tag) emitted by the LLM
+_FENCE_RE = re.compile(r"```(?:python|javascript|typescript|java|cpp|rust|go|csharp|js)?")
+
 def set_agent(agent_instance):
     """Set the agent instance from MCP server"""
     global agent
     agent = agent_instance
     logger.info("Agent instance set in TDD helpers")
 
-import asyncio
-import subprocess
+# Maximum number of LLM requests in flight across all clients
+LLM_CONCURRENCY = int(os.environ.get("LLM_CONCURRENCY", "8"))
+
+# Bounds concurrent LLM requests without serializing every client behind one call
+llm_semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+
+# Overall deadline for one LLM generation, so a stalled model can't keep a
+# client waiting forever (the HTTP timeout only bounds each read)
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "180"))
+
+# Threads for the blocking LLM calls, kept apart from the default executor so
+# long generations don't starve short to_thread/run_in_executor work
+LLM_WORKERS = int(os.environ.get("LLM_WORKERS", str(LLM_CONCURRENCY)))
+_LLM_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=LLM_WORKERS, thread_name_prefix="llm")
+
+# Strong references to fire-and-forget tasks so they aren't garbage collected mid-run
+_background_tasks: set = set()
+
+class LLMGenerationCancelled(Exception):
+    """Raised into a streaming LLM call to stop a generation nobody is waiting for"""
+
+def _encode_json(payload: Any) -> Optional[bytes]:
+    """Encode a payload as JSON bytes with msgspec or orjson, or return None if neither is installed"""
+    if _msgspec_encoder is not None:
+        return _msgspec_encoder.encode(payload)
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return None
+
+async def send_message(websocket: "WebSocket", payload: Dict[str, Any]):
+    """Serialize a message and send it on the WebSocket (as bytes when msgspec or orjson is available)"""
+    data = _encode_json(payload)
+    if data is not None:
+        await websocket.send_bytes(data)
+    else:
+        await websocket.send_json(payload)
 
-# Global lock for serializing LLM requests
-llm_request_lock = asyncio.Lock()
+def _release_llm_slot(loop: asyncio.AbstractEventLoop):
+    """Give back an llm_semaphore slot from whichever thread an LLM call finished on"""
+    try:
+        loop.call_soon_threadsafe(llm_semaphore.release)
+    except RuntimeError:
+        # The event loop is closed, so nothing is waiting for the slot
+        pass
+
+def _submit_llm_call(loop: asyncio.AbstractEventLoop, func, *args) -> asyncio.Future:
+    """
+    Run a blocking LLM call on the LLM executor, in an llm_semaphore slot the caller acquired
+
+    The slot is only released when the call returns. A timeout stops the
+    waiting but not the executor thread, and freeing the slot earlier would
+    admit a request that queues behind the abandoned call with its own
+    deadline already running.
+    """
+    try:
+        call = _LLM_EXECUTOR.submit(func, *args)
+    except BaseException:
+        llm_semaphore.release()
+        raise
+    call.add_done_callback(lambda _: _release_llm_slot(loop))
+    return asyncio.wrap_future(call, loop=loop)
+
+async def call_llm(func, *args) -> Dict[str, Any]:
+    """Run a blocking LLM call within the concurrency limit, giving up after LLM_TIMEOUT"""
+    loop = asyncio.get_running_loop()
+    # Waiting for a slot doesn't count against the deadline
+    await llm_semaphore.acquire()
+    return await asyncio.wait_for(_submit_llm_call(loop, func, *args), timeout=LLM_TIMEOUT)
 
-async def handle_tdd_request(message, websocket: WebSocket):
+async def stream_tests_from_llm(prompt: str, websocket: "WebSocket", context: Dict[str, Any],
+                                iteration: int) -> Dict[str, Any]:
+    """
+    Generate tests with the agent's streaming API, forwarding each chunk as a
+    "tdd_tests_delta" message. The usual "tdd_tests" message sent afterwards
+    marks the end of the stream.
+
+    Raises:
+        asyncio.TimeoutError: if the generation takes longer than LLM_TIMEOUT;
+            it is then stopped at its next chunk
+    """
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+
+    def on_chunk(text: str):
+        # Called from the executor thread; raising ends the agent's read loop,
+        # which closes the HTTP response
+        if cancelled.is_set():
+            raise LLMGenerationCancelled("LLM generation cancelled")
+        loop.call_soon_threadsafe(chunks.put_nowait, text)
+
+    await llm_semaphore.acquire()
+    llm_future = _submit_llm_call(loop, agent.stream_prompt_to_llm, prompt, on_chunk)
+    llm_future.add_done_callback(lambda _: chunks.put_nowait(None))
+    try:
+        await asyncio.wait_for(_forward_test_chunks(chunks, websocket, context, iteration), timeout=LLM_TIMEOUT)
+        return await llm_future
+    finally:
+        # Timed out or cancelled: stop the generation instead of letting it run to the end
+        cancelled.set()
+
+async def _forward_test_chunks(chunks: asyncio.Queue, websocket: "WebSocket", context: Dict[str, Any],
+                               iteration: int):
+    """Send generated test chunks as "tdd_tests_delta" messages until the generation ends"""
+    # Every delta carries the same context, so encode it once and splice it into each frame
+    context_json = _encode_json(context)
+    if context_json is not None:
+        delta_prefix = b'{"message_type":"tdd_tests_delta","context":' + context_json + b',"content":'
+
+    client_connected = True
+    while True:
+        text = await chunks.get()
+        if text is None:
+            break
+        if not client_connected:
+            continue
+        try:
+            if context_json is not None:
+                await websocket.send_bytes(delta_prefix + _encode_json({"text": text, "iteration": iteration}) + b"}")
+            else:
+                await send_message(websocket, {
+                    "message_type": "tdd_tests_delta",
+                    "context": context,
+                    "content": {"text": text, "iteration": iteration}
+                })
+        except Exception as e:
+            logger.error(f"Failed to stream TDD tests on WebSocket: {e}")
+            client_connected = False
+
+async def handle_tdd_request(message, websocket: "WebSocket"):
     """Handle a TDD test generation request"""
     global agent
+    from pydantic import BaseModel
+    from src.web_interface import add_to_logs
+    
+    # Dump the context once; it is echoed back on every message sent for this request
+    context = message.context
+    context_dump = context.model_dump(mode="json") if isinstance(context, BaseModel) else dict(context)
+    metadata = context_dump.get("metadata")
+    if not isinstance(metadata, dict):
+        metadata = {}
     
     # Extract TDD request data
     tdd_request = message.content
     
-    # Check if content is a dict or a Pydantic model
-    if hasattr(tdd_request, "__dict__"):
-        # It's a Pydantic model
-        tdd_dict = tdd_request.dict() if hasattr(tdd_request, "dict") else tdd_request.__dict__
-        code = tdd_dict.get("code", "")
-        language = tdd_dict.get("language", "python")
-        iteration = tdd_dict.get("iteration", 1)
-        task_description = tdd_dict.get("task_description", "")
-        original_code = tdd_dict.get("original_code", "")
-        max_iterations = tdd_dict.get("max_iterations", DEFAULT_MAX_ITERATIONS)
-    else:
-        # It's a dict
-        code = tdd_request.get("code", "")
-        language = tdd_request.get("language", "python")
-        iteration = tdd_request.get("iteration", 1)
-        task_description = tdd_request.get("task_description", "")
-        original_code = tdd_request.get("original_code", "")
-        max_iterations = tdd_request.get("max_iterations", DEFAULT_MAX_ITERATIONS)
+    # Content is a Pydantic model for typed requests and a plain dict otherwise
+    tdd_dict = tdd_request.model_dump() if isinstance(tdd_request, BaseModel) else tdd_request
+    code = tdd_dict.get("code", "")
+    language = tdd_dict.get("language", "python")
+    iteration = tdd_dict.get("iteration", 1)
+    task_description = tdd_dict.get("task_description", "")
+    original_code = tdd_dict.get("original_code", "")
+    max_iterations = tdd_dict.get("max_iterations", DEFAULT_MAX_ITERATIONS)
     
     # Ensure iteration is within bounds
     if iteration > max_iterations:
@@ -82,42 +228,45 @@ async def handle_tdd_request(message, websocket: WebSocket):
     
     # Get additional info from metadata if available
     test_purpose = "Generate unit tests"
-    if hasattr(message.context, "metadata") and message.context.metadata:
-        if isinstance(message.context.metadata, dict):
-            test_purpose = message.context.metadata.get("test_purpose", test_purpose)
+    if metadata:
+        test_purpose = metadata.get("test_purpose", test_purpose)
+        
+        # If task description not in content, try to get it from metadata
+        if not task_description and "task_description" in metadata:
+            task_description = metadata.get("task_description", "")
             
-            # If task description not in content, try to get it from metadata
-            if not task_description and "task_description" in message.context.metadata:
-                task_description = message.context.metadata.get("task_description", "")
-                
-            # If original code not in content, try to get it from metadata
-            if not original_code and "original_code" in message.context.metadata:
-                original_code = message.context.metadata.get("original_code", "")
-            
-            # Check for max iterations in metadata
-            if "max_iterations" in message.context.metadata:
-                metadata_max_iterations = message.context.metadata.get("max_iterations")
-                if isinstance(metadata_max_iterations, int) and metadata_max_iterations > 0:
-                    max_iterations = metadata_max_iterations
+        # If original code not in content, try to get it from metadata
+        if not original_code and "original_code" in metadata:
+            original_code = metadata.get("original_code", "")
+        
+        # Check for max iterations in metadata
+        if "max_iterations" in metadata:
+            metadata_max_iterations = metadata.get("max_iterations")
+            if isinstance(metadata_max_iterations, int) and metadata_max_iterations > 0:
+                max_iterations = metadata_max_iterations
     
-    # Create prompt for the LLM
-    prompt = create_tdd_test_prompt(code, language, iteration, test_purpose, task_description, original_code, max_iterations)
+    # Create the enhanced prompt for the LLM (cached, since retries repeat the same inputs)
+    prompt = build_enhanced_tdd_prompt(code, language, iteration, test_purpose, task_description, original_code, max_iterations)
     
-    # Enhance the prompt with language-specific templates
-    prompt = enhance_tdd_prompt(prompt, language, iteration, code, task_description, original_code)
-    
-    # Further enhance with adaptive test generation strategies
-    prompt = enhance_test_prompt_with_adaptive_strategy(prompt, code, language, task_description, iteration, max_iterations)
+    # Clients opt in to incremental "tdd_tests_delta" messages via metadata
+    stream_tests = bool(metadata.get("stream_tests", False))
     
     # Generate tests using LLM with extended timeout and clear error reporting
     generated_tests = ""
+    error_message = "Unknown error: No tests generated."
     try:
-        if agent and hasattr(agent, 'send_prompt_to_llm'):
-            logger.info(f"Generating tests for iteration {iteration}/{max_iterations} using agent.send_prompt_to_llm (serialized)")
-            import asyncio
-            loop = asyncio.get_event_loop()
-            async with llm_request_lock:
-                llm_response = await loop.run_in_executor(None, agent.send_prompt_to_llm, prompt)
+        if agent and stream_tests and hasattr(agent, 'stream_prompt_to_llm'):
+            logger.info(f"Streaming tests for iteration {iteration}/{max_iterations} using agent.stream_prompt_to_llm")
+            llm_response = await stream_tests_from_llm(prompt, websocket, context_dump, iteration)
+            if llm_response.get("success") and llm_response.get("response"):
+                generated_tests = cleanup_generated_tests(llm_response["response"], language)
+            else:
+                logger.error(f"LLM test generation failed: {llm_response.get('error', 'Unknown error')}")
+                generated_tests = ""
+                error_message = f"LLM model error: {llm_response.get('error', 'No response from LLM')}"
+        elif agent and hasattr(agent, 'send_prompt_to_llm'):
+            logger.info(f"Generating tests for iteration {iteration}/{max_iterations} using agent.send_prompt_to_llm")
+            llm_response = await call_llm(agent.send_prompt_to_llm, prompt)
             if llm_response.get("success") and llm_response.get("response"):
                 generated_tests = cleanup_generated_tests(llm_response["response"], language)
             else:
@@ -128,6 +277,10 @@ async def handle_tdd_request(message, websocket: WebSocket):
             logger.error("Agent or send_prompt_to_llm not available. Cannot generate tests.")
             generated_tests = ""
             error_message = "LLM backend is not available. Please check your Olama/LLM connection."
+    except asyncio.TimeoutError:
+        logger.error(f"LLM test generation timed out after {LLM_TIMEOUT:g}s")
+        generated_tests = ""
+        error_message = f"LLM timeout: no response within {LLM_TIMEOUT:g} seconds"
     except Exception as e:
         logger.error(f"Unexpected error in test generation: {e}")
         generated_tests = ""
@@ -142,7 +295,7 @@ async def handle_tdd_request(message, websocket: WebSocket):
         "max_iterations": max_iterations
     }
     if not generated_tests:
-        response_content["error"] = error_message if 'error_message' in locals() else "Unknown error: No tests generated."
+        response_content["error"] = error_message
     
     # Execute tests if we have generated code
     if generated_tests:
@@ -190,137 +343,228 @@ async def handle_tdd_request(message, websocket: WebSocket):
 
     response = {
         "message_type": "tdd_tests",
-        "context": message.context.model_dump() if hasattr(message.context, "model_dump") else message.context.dict(),
+        "context": context_dump,
         "content": response_content
     }
 
-    # Log outgoing TDD tests
-    add_to_logs("outgoing", "tdd_tests", response["content"])
+    # Log outgoing TDD tests in the background so the file write doesn't delay the send
+    log_task = asyncio.create_task(asyncio.to_thread(add_to_logs, "outgoing", "tdd_tests", response["content"]))
+    _background_tasks.add(log_task)
+    log_task.add_done_callback(_background_tasks.discard)
 
     # Send response with error handling for closed WebSocket
-    import logging
     try:
-        await websocket.send_text(json.dumps(response))
+        await send_message(websocket, response)
     except Exception as e:
-        logging.error(f"Failed to send TDD response on WebSocket: {e}")
+        logger.error(f"Failed to send TDD response on WebSocket: {e}")
 
-def create_tdd_test_prompt(code, language, iteration, test_purpose, task_description="", original_code="", max_iterations=DEFAULT_MAX_ITERATIONS):
-    """Create a prompt for generating TDD tests based on iteration number and task description"""
-    base_prompt = f"""
-You are a test-driven development expert. Generate unit tests for the following {language} code:
-
-```{language}
-{code}
-```
+# Opening of every TDD prompt; kept free of per-request data so it forms a stable prefix
+_PROMPT_FRAMING = """
+You are a test-driven development expert. Generate unit tests for the code given at the end of this prompt.
 """
-    
-    # Add task description context if available
-    if task_description:
-        base_prompt += f"""
-The code is intended to: {task_description}
 
-Make sure your tests verify that the code correctly fulfills this purpose.
+# Output rules shared by every TDD prompt
+_PROMPT_TRAILER = """
+Return ONLY the test code in the appropriate language, nothing else. Do not include explanations, just the executable test code that can be run directly.
+For Python, use pytest or unittest framework.
+Ensure tests are well-structured and follow best practices for the language.
 """
 
-    # Add original code for comparison if available
-    if original_code and original_code != code:
-        base_prompt += f"""
-This is a modification of the original code:
-
-```{language}
-{original_code}
-```
-
-Your tests should verify that the modifications maintain correct behavior and fulfill the intended purpose.
-"""
-    
-    # Add specific requirements based on iteration
-    iteration_prompts = {
-        1: """
+# Iteration-specific test requirements, one per iteration of the standard five
+_ITER1 = sys.intern("""
 For this first iteration, create basic tests that verify:
 1. The function exists and is callable
 2. It returns the correct result for basic input values (0, 1)
 3. Include simple edge cases
 4. Verify the behavior aligns with the task description
-""",
-        2: """
+""")
+_ITER2 = sys.intern("""
 For the second iteration, extend test coverage to include:
 1. Testing with larger inputs (5, 10)
 2. Verify correctness of results with known values
 3. Add more comprehensive edge cases
 4. Ensure the implementation satisfies all requirements in the task description
-""",
-        3: """
+""")
+_ITER3 = sys.intern("""
 For the third iteration, focus on error handling:
 1. Test behavior with invalid inputs (negative numbers, non-integers)
 2. Check for potential exceptions or error conditions
 3. Verify function handles boundary conditions correctly
 4. Test edge cases specific to the task description
-""",
-        4: """
+""")
+_ITER4 = sys.intern("""
 For the fourth iteration, focus on performance considerations:
 1. Test with larger inputs that might cause stack overflow
 2. Consider performance implications and possible optimizations
 3. Suggest potential improvements to handle large inputs
 4. Verify the implementation is efficient for the task described
-""",
-        5: """
+""")
+_ITER5 = sys.intern("""
 For the final iteration, conduct a comprehensive review:
 1. Summarize test coverage
 2. Identify any remaining gaps in testing
 3. Suggest code improvements based on test findings
 4. Provide a final assessment of code quality
 5. Evaluate how well the implementation fulfills the task description
+""")
+
+_ITERATION_PROMPTS: Tuple[str, ...] = (_ITER1, _ITER2, _ITER3, _ITER4, _ITER5)
+
+
+def _iteration_stage(iteration: int, max_iterations: int) -> int:
+    """
+    Map an iteration onto one of the five standard TDD stages
+
+    The standard five iterations map one-to-one onto the stages. Custom
+    iteration counts always open with the basic tests and end with the
+    comprehensive review, and the iterations in between are spread over the
+    stages by their progress through the run.
+
+    Args:
+        iteration: Current iteration, starting at 1
+        max_iterations: Total number of iterations in the run
+
+    Returns:
+        The stage from 1 (basic tests) to 5 (comprehensive review), or 0
+        for an iteration outside a standard five-iteration run
+    """
+    if max_iterations == 5:
+        return iteration if 1 <= iteration <= 5 else 0
+    if iteration == max_iterations:
+        return 5
+    if iteration == 1:
+        return 1
+    # Quarters of progress select basic, extended, error handling or performance tests;
+    # int() truncates toward zero, so negative progress is clamped to the basic tests
+    progress_percentage = iteration / max_iterations
+    return max(1, min(int(progress_percentage * 4), 3) + 1)
+
+
+def _pick_iteration_prompt(iteration: int, max_iterations: int) -> str:
+    """Pick the iteration instructions to include in the prompt for an iteration"""
+    stage = _iteration_stage(iteration, max_iterations)
+    if stage:
+        return _ITERATION_PROMPTS[stage - 1]
+    return "Generate appropriate tests for this iteration."
+
+
+@lru_cache(maxsize=64)
+def _iteration_section(iteration: int, max_iterations: int) -> str:
+    """Iteration header and instructions; only a handful of distinct (iteration, max_iterations) pairs occur"""
+    return sys.intern(f"\nThis is iteration {iteration} of {max_iterations}.\n{_pick_iteration_prompt(iteration, max_iterations)}")
+
+
+# Stages that skip the adaptive strategy pass: the performance stage already gets
+# pointed guidance from its iteration prompt, and the final review gains nothing from
+# it. The language template pass runs at every stage, as it is the only source of
+# framework guidance for languages other than Python
+_SKIP_ADAPTIVE_STAGES = frozenset({4, 5})
+
+
+# Dynamic suffix of the prompt: the code under test
+_CODE_SECTION_TEMPLATE = """
+The {language} code to test:
+
+```{language}
+{code}
+```
 """
-    }
-    
-    # Handle custom max_iterations by adapting prompts as needed
-    if max_iterations != 5:
-        if iteration == max_iterations:
-            # Final iteration: always use comprehensive review
-            iteration_prompt = iteration_prompts.get(5, "Conduct a comprehensive review of the code and tests.")
-        elif iteration == 1:
-            iteration_prompt = iteration_prompts.get(1, "Generate basic tests for the code.")
-        else:
-            # Adapt prompt based on progress through custom iterations
-            progress_percentage = iteration / max_iterations
-            if progress_percentage < 0.25:
-                iteration_prompt = iteration_prompts.get(1, "Generate basic tests for the code.")
-            elif progress_percentage < 0.5:
-                iteration_prompt = iteration_prompts.get(2, "Generate extended tests for the code.")
-            elif progress_percentage < 0.75:
-                iteration_prompt = iteration_prompts.get(3, "Focus on error handling in your tests.")
-            else:
-                iteration_prompt = iteration_prompts.get(4, "Focus on performance considerations in your tests.")
-    else:
-        # Use standard 5-iteration prompts
-        iteration_prompt = iteration_prompts.get(iteration, "Generate appropriate tests for this iteration.")
-    
-    # Add iteration context
-    iteration_prompt = f"This is iteration {iteration} of {max_iterations}.\n{iteration_prompt}"
-    
+
+_TASK_SECTION_TEMPLATE = """
+The code is intended to: {task_description}
+
+Make sure your tests verify that the code correctly fulfills this purpose.
+"""
+
+_ORIGINAL_SECTION_TEMPLATE = """
+This is a modification of the original code:
+
+```{language}
+{original_code}
+```
+
+Your tests should verify that the modifications maintain correct behavior and fulfill the intended purpose.
+"""
+
+def create_tdd_test_prompt(code, language, iteration, test_purpose, task_description="", original_code="", max_iterations=DEFAULT_MAX_ITERATIONS):
+    """Create a prompt for generating TDD tests based on iteration number and task description
+
+    The prompt starts with the static framing and the iteration instructions,
+    and ends with the code and task sections that change on every request, so
+    consecutive requests share a byte-identical prefix the LLM backend can
+    reuse from its prompt cache.
+    """
+    # Static prefix: framing and output rules, then the iteration instructions
+    parts = [_PROMPT_FRAMING, _PROMPT_TRAILER, _iteration_section(iteration, max_iterations)]
+
     # Add custom test purpose if provided
     if test_purpose and test_purpose != "Generate unit tests":
-        iteration_prompt += f"\n\nAdditional focus: {test_purpose}"
-    
-    final_prompt = base_prompt + iteration_prompt + """
-Return ONLY the test code in the appropriate language, nothing else. Do not include explanations, just the executable test code that can be run directly.
-For Python, use pytest or unittest framework.
-Ensure tests are well-structured and follow best practices for the language.
-"""
-    
-    return final_prompt
+        parts.append(f"\nAdditional focus: {test_purpose}\n")
+
+    # Dynamic suffix: the code under test and its context
+    parts.append(_CODE_SECTION_TEMPLATE.format(language=language, code=code))
+    if task_description:
+        parts.append(_TASK_SECTION_TEMPLATE.format(task_description=task_description))
+    if original_code and original_code != code:
+        parts.append(_ORIGINAL_SECTION_TEMPLATE.format(language=language, original_code=original_code))
+
+    return "".join(parts)
+
+
+@lru_cache(maxsize=512)
+def build_enhanced_tdd_prompt(code, language, iteration, test_purpose, task_description="", original_code="", max_iterations=DEFAULT_MAX_ITERATIONS):
+    """
+    Create the TDD prompt and apply the language-specific and adaptive enhancements
+
+    The adaptive strategy pass is skipped for some stages (see
+    _SKIP_ADAPTIVE_STAGES). Every step is a pure function of the arguments, so
+    results are memoized; a client retrying an iteration gets its prompt
+    back without re-running the template and strategy analysis.
+
+    Args:
+        code: The code to generate tests for
+        language: The programming language
+        iteration: Current iteration in the TDD cycle
+        test_purpose: Extra focus for the tests
+        task_description: Description of what the code should do
+        original_code: The code before the proposed changes
+        max_iterations: Maximum number of iterations
+
+    Returns:
+        The prompt to send to the LLM
+    """
+    prompt = create_tdd_test_prompt(code, language, iteration, test_purpose, task_description, original_code, max_iterations)
+
+    # Enhance the prompt with language-specific templates
+    prompt = enhance_tdd_prompt(prompt, language, iteration, code, task_description, original_code)
+
+    # Further enhance with adaptive test generation strategies
+    if _iteration_stage(iteration, max_iterations) not in _SKIP_ADAPTIVE_STAGES:
+        prompt = enhance_test_prompt_with_adaptive_strategy(prompt, code, language, task_description, iteration, max_iterations)
+
+    return prompt
+
+def _strip_fences(test_code: str) -> str:
+    """Remove markdown code fences, only touching the ends when the response is a single fenced block"""
+    stripped = test_code.strip()
+    if (len(stripped) >= 6 and stripped.startswith("```") and stripped.endswith("```")
+            and "```" not in stripped[3:-3]):
+        # Usual LLM reply: one opening fence (with optional language tag) and one closing fence
+        return stripped[_FENCE_RE.match(stripped).end():-3]
+    return _FENCE_RE.sub("", test_code)
+
 
 def cleanup_generated_tests(test_code, language):
     """Clean up the generated test code to ensure it's valid"""
     # Remove markdown code block markers if present
-    test_code = test_code.replace("```python", "").replace("```javascript", "").replace("```js", "").replace("```", "")
+    test_code = _strip_fences(test_code)
     
     # Add appropriate imports for the language
     if language.lower() == "python" and "import " not in test_code:
         if "unittest" in test_code:
             test_code = "import unittest\n\n" + test_code
-        elif "pytest" in test_code and "pytest" not in test_code:
+        elif "pytest." in test_code:
+            # Uses pytest helpers such as pytest.raises without importing pytest
             test_code = "import pytest\n\n" + test_code
     
 
@@ -9,22 +9,283 @@ and documentation of test outcomes during the monitoring process.
 """
 import os
 import re
+import shutil
+import signal
 import tempfile
 import subprocess
 import logging
 import json
-from typing import Dict, List, Any, Tuple, Optional
+import atexit
+import concurrent.futures
+import contextlib
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Any, Tuple, Optional
 from pathlib import Path
 import sys
 
+# orjson is optional; it writes large test reports considerably faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from src.language_test_templates import TEST_FRAMEWORKS
 from src.test_quality_metrics import evaluate_test_quality
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Set AIDM_PERSISTENT_RUNNERS=0 to run every test job in a fresh process
+PERSISTENT_RUNNERS_ENABLED = os.environ.get("AIDM_PERSISTENT_RUNNERS", "1") != "0"
+
+PYTEST_WORKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pytest_worker.py")
+
+# Test tool executables, resolved once; commands are run as argv lists without a shell
+_PYTEST = [sys.executable, "-m", "pytest"]
+_NPX = shutil.which("npx") or "npx"
+_TSC = shutil.which("tsc") or "tsc"
+_CMAKE = shutil.which("cmake") or "cmake"
+_MAKE = shutil.which("make") or "make"
+_GXX = shutil.which("g++") or "g++"
+_JAVAC = shutil.which("javac") or "javac"
+_JAVA = shutil.which("java") or "java"
+
+# CMakeLists.txt written for C++ test builds; only the test file varies
+_CMAKE_TEMPLATE = """
+cmake_minimum_required(VERSION 3.10)
+project(TestProject)
+
+set(CMAKE_CXX_STANDARD 23)
+set(CMAKE_CXX_STANDARD_REQUIRED ON)
+
+# Google Test
+find_package(GTest QUIET)
+if(GTest_FOUND)
+    enable_testing()
+    add_executable(test_runner {test_file})
+    target_link_libraries(test_runner GTest::GTest GTest::Main)
+    add_test(NAME TestSuite COMMAND test_runner)
+else()
+    message(STATUS "Google Test not found, skipping tests")
+endif()
+"""
+
+# Read size for streaming test command output
+_OUTPUT_BLOCK_SIZE = 64 * 1024
+
+# Source file extensions per language
+_FILE_EXTENSIONS: Dict[str, str] = {
+    "python": ".py",
+    "javascript": ".js",
+    "typescript": ".ts",
+    "java": ".java",
+    "csharp": ".cs",
+    "cpp": ".cpp",
+    "rust": ".rs",
+    "go": ".go",
+    "ruby": ".rb"
+}
+
+# Import statements rewritten by adjust_test_imports
+_PY_ANY_IMPORT_RE = re.compile(r"from\s+\w+\s+import|import\s+\w+")
+_PY_FROM_IMPORT_RE = re.compile(r"from\s+(\w+)\s+import")
+_PY_IMPORT_RE = re.compile(r"import\s+(\w+)")
+_JS_ANY_IMPORT_RE = re.compile(r"(require|import)\s+.*from")
+_JS_IMPORT_FROM_RE = re.compile(r"(require|import)\s+.*from\s+['\"]([^'\"]+)['\"]")
+
+# Java source patterns used by extract_class_name
+_JAVA_PACKAGE_RE = re.compile(r"package\s+([a-zA-Z0-9_.]+);")
+_JAVA_PUBLIC_CLASS_RE = re.compile(r"public\s+class\s+([a-zA-Z0-9_]+)")
+
+# Test framework summaries parsed by parse_test_output
+_PYTEST_SUMMARY_RE = re.compile(r"(\d+) passed,?\s*(\d+) failed")
+_PYTEST_PASSED_RE = re.compile(r"(\d+) passed")
+_JEST_SUMMARY_RE = re.compile(r"Tests:.*?(\d+) passed,.*?(\d+) failed,.*?(\d+) total")
+_GTEST_TOTAL_RE = re.compile(r"\[==========\]\s*(\d+) tests")
+_GTEST_PASSED_RE = re.compile(r"\[  PASSED  \]\s*(\d+) tests?")
+_JUNIT_SUMMARY_RE = re.compile(r"Tests run: (\d+), Failures: (\d+), Errors: (\d+)")
+_GENERIC_COUNTS_RE = re.compile(
+    r"(\d+)(?:\s+|-)(?:(?P<total>tests?|specs?)"
+    r"|(?P<passed>passing|passed|ok)"
+    r"|(?P<failed>failing|failed|errors?|broken))",
+    re.IGNORECASE
+)
+_GENERIC_SUCCESS_RE = re.compile(r"success|all\s+tests\s+passed", re.IGNORECASE)
+_ERROR_LINE_RE = re.compile(r"error|fail|exception|assertion", re.IGNORECASE)
+# The line boundaries str.splitlines() recognizes
+_LINE_BREAK_RE = re.compile(r"\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+# Test patterns for different languages, used by count_tests; the
+# alternatives in each pattern can't overlap, so one scan counts them all
+_TEST_COUNT_PATTERNS: Dict[str, re.Pattern] = {
+    "python": re.compile(
+        r"def\s+test_\w+\s*\("     # pytest style
+        r"|self\.assert\w+\("       # unittest style
+    ),
+    "javascript": re.compile(r"(?:it|test)\s*\(\s*['\"]"),   # Jest/Mocha style
+    "typescript": re.compile(r"(?:it|test)\s*\(\s*['\"]"),
+    "java": re.compile(
+        r"@Test"                    # JUnit style
+        r"|public\s+void\s+test\w+"
+    ),
+    "cpp": re.compile(r"TEST(?:_F)?\s*\(")  # Google Test style
+}
+# "test" and "assert" can overlap (e.g. "assertest"), so they are counted separately
+_GENERIC_TEST_COUNT_PATTERNS = [re.compile(r"test"), re.compile(r"assert")]
+_ASSERTION_RE = re.compile(r"assert|expect|should", re.IGNORECASE)
+
+class PersistentTestRunner:
+    """
+    A long-lived test runner process that accepts newline-delimited JSON jobs.
+
+    Keeping the interpreter (and the test framework) warm means consecutive
+    TDD iterations only pay the start-up cost once.
+    """
+    def __init__(self, argv: List[str]):
+        self.argv = argv
+        self.process: Optional[subprocess.Popen] = None
+        self._responses: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+
+    def _start(self):
+        self.process = subprocess.Popen(
+            self.argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1
+        )
+        self._responses = queue.Queue()
+        threading.Thread(target=self._read_responses, args=(self.process, self._responses), daemon=True).start()
+
+    @staticmethod
+    def _read_responses(process: subprocess.Popen, responses: "queue.Queue[Optional[str]]"):
+        for line in process.stdout:
+            responses.put(line)
+        responses.put(None)  # EOF: the worker has exited
+
+    def run(self, job: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """
+        Send a job to the worker and wait for its result
+
+        Raises:
+            subprocess.TimeoutExpired: if the worker doesn't answer in time (the worker is killed)
+            RuntimeError: if the worker died or answered with something unparseable
+        """
+        with self._lock:
+            try:
+                # Starting can fail too (e.g. EMFILE under load); report it like a dead worker
+                if self.process is None or self.process.poll() is not None:
+                    self._start()
+                self.process.stdin.write(json.dumps(job) + "\n")
+                self.process.stdin.flush()
+                line = self._responses.get(timeout=timeout)
+            except queue.Empty:
+                self.close()
+                raise subprocess.TimeoutExpired(self.argv, timeout)
+            except (OSError, ValueError) as e:
+                self.close()
+                raise RuntimeError(f"Test runner process is not available: {e}")
+            if line is None:
+                self.close()
+                raise RuntimeError("Test runner process exited unexpectedly")
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError as e:
+                self.close()
+                raise RuntimeError(f"Invalid response from test runner process: {e}")
+            # The worker exits after a job it couldn't clean up after; the
+            # next job starts a fresh one
+            if result.pop("recycle", False):
+                self.close()
+            return result
+
+    def close(self):
+        """Terminate the worker process"""
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.kill()
+            self.process.wait()
+            self.process = None
+
+class PersistentRunnerPool:
+    """
+    A small pool of persistent runners for one language.
+
+    Each job checks out an idle runner, so independent jobs (e.g. a batch of
+    TDD iterations) run in parallel instead of queueing on a single worker.
+    """
+    def __init__(self, argv: List[str], size: int):
+        self.argv = argv
+        self.size = max(1, size)
+        self._runners: List[PersistentTestRunner] = []
+        self._idle: List[PersistentTestRunner] = []
+        self._available = threading.Condition()
+
+    @contextlib.contextmanager
+    def checkout(self):
+        """Borrow an idle runner, starting a new one if the pool isn't full yet"""
+        with self._available:
+            while not self._idle and len(self._runners) >= self.size:
+                self._available.wait()
+            if self._idle:
+                runner = self._idle.pop()
+            else:
+                runner = PersistentTestRunner(self.argv)
+                self._runners.append(runner)
+        try:
+            yield runner
+        finally:
+            with self._available:
+                self._idle.append(runner)
+                self._available.notify()
+
+    def close(self):
+        """Terminate every runner in the pool"""
+        for runner in self._runners:
+            runner.close()
+
+# Maximum number of warm runner processes per language
+PERSISTENT_RUNNER_POOL_SIZE = int(os.environ.get("AIDM_RUNNER_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+
+# Long-lived runner pools per language, started on first use
+_RUNTIME_POOL: Dict[str, PersistentRunnerPool] = {}
+_RUNTIME_POOL_ARGV: Dict[str, List[str]] = {
+    "python": [sys.executable, "-u", PYTEST_WORKER_PATH]
+}
+_RUNTIME_POOL_LOCK = threading.Lock()
+
+def get_persistent_runner_pool(language: str) -> Optional[PersistentRunnerPool]:
+    """Return the persistent runner pool for a language, or None if it doesn't have one"""
+    if not PERSISTENT_RUNNERS_ENABLED or language not in _RUNTIME_POOL_ARGV:
+        return None
+    with _RUNTIME_POOL_LOCK:
+        pool = _RUNTIME_POOL.get(language)
+        if pool is None:
+            pool = _RUNTIME_POOL[language] = PersistentRunnerPool(_RUNTIME_POOL_ARGV[language], PERSISTENT_RUNNER_POOL_SIZE)
+    return pool
+
+@atexit.register
+def shutdown_persistent_runners():
+    """Stop all persistent runner processes"""
+    for pool in _RUNTIME_POOL.values():
+        pool.close()
+    _RUNTIME_POOL.clear()
+
 class TestExecutionResult:
     """Class to hold test execution results"""
+    __slots__ = (
+        "success", "total_tests", "passed_tests", "failed_tests", "execution_time",
+        "output", "errors", "test_file_path", "implementation_file_path"
+    )
+    
     def __init__(self, 
                 success: bool = False, 
                 total_tests: int = 0, 
@@ -74,6 +335,31 @@ class TestExecutionResult:
             implementation_file_path=data.get("implementation_file_path", "")
         )
 
+# Set AIDM_KEEP_TEMP=1 to keep the generated test files for debugging
+KEEP_TEMP_FILES = os.environ.get("AIDM_KEEP_TEMP", "0") == "1"
+
+_SESSION_TMP: Optional[str] = None
+_SESSION_TMP_LOCK = threading.Lock()
+
+def _make_job_dir(prefix: str) -> str:
+    """Create a fresh directory for one test job under the session's temporary directory"""
+    global _SESSION_TMP
+    with _SESSION_TMP_LOCK:
+        if _SESSION_TMP is None:
+            _SESSION_TMP = tempfile.mkdtemp(prefix="aidm_tests_")
+            if not KEEP_TEMP_FILES:
+                atexit.register(shutil.rmtree, _SESSION_TMP, ignore_errors=True)
+    job_dir = os.path.join(_SESSION_TMP, f"{prefix}_{uuid.uuid4().hex}")
+    os.mkdir(job_dir)
+    return job_dir
+
+def _discard_job_dir(job_dir: str):
+    """Remove a job directory in the background so the caller gets its result right away"""
+    if KEEP_TEMP_FILES:
+        logger.info(f"Keeping test files in {job_dir}")
+        return
+    threading.Thread(target=shutil.rmtree, args=(job_dir,), kwargs={"ignore_errors": True}, daemon=True).start()
+
 def execute_tests(test_code: str, implementation_code: str, language: str, 
                  iteration: int, task_description: str) -> TestExecutionResult:
     """
@@ -92,42 +378,129 @@ def execute_tests(test_code: str, implementation_code: str, language: str,
     logger.info(f"Executing tests for {language} code (iteration {iteration})")
     
     # Create temporary files for the test and implementation
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Determine file extensions
-        file_extensions = {
-            "python": ".py",
-            "javascript": ".js", 
-            "typescript": ".ts",
-            "java": ".java",
-            "csharp": ".cs",
-            "cpp": ".cpp",
-            "rust": ".rs",
-            "go": ".go",
-            "ruby": ".rb"
-        }
-        
-        ext = file_extensions.get(language.lower(), ".txt")
-        
-        # Create implementation file
-        impl_file_path = os.path.join(temp_dir, f"implementation{ext}")
-        with open(impl_file_path, 'w') as f:
-            f.write(implementation_code)
-        
-        # Create test file - adjust imports/includes to reference the implementation file
-        test_file = adjust_test_imports(test_code, language, "implementation")
-        test_file_path = os.path.join(temp_dir, f"test{ext}")
-        with open(test_file_path, 'w') as f:
-            f.write(test_file)
+    temp_dir = _make_job_dir(f"iter{iteration}")
+    try:
+        return _run_tests_in_dir(temp_dir, test_code, implementation_code, language, iteration, task_description)
+    finally:
+        _discard_job_dir(temp_dir)
+
+# Set AIDM_SPECULATIVE_CPP=1 to start the CMake build and the direct g++
+# compile together and use whichever finishes first (uses an extra core)
+SPECULATIVE_CPP_BUILDS = os.environ.get("AIDM_SPECULATIVE_CPP", "0") == "1"
+
+# Upper bound on test jobs run at the same time by execute_tests_batch
+TEST_BATCH_WORKERS = int(os.environ.get("AIDM_TEST_BATCH_WORKERS", str(os.cpu_count() or 1)))
+
+def execute_tests_batch(jobs: List[Tuple[str, str, str, int, str]]) -> List[Any]:
+    """
+    Execute several independent test jobs concurrently
+    
+    Every job gets its own subdirectory of a single job directory, and
+    the jobs run in parallel (each one waits on a test runner process, so
+    threads are enough to overlap them).
+    
+    Args:
+        jobs: (test_code, implementation_code, language, iteration, task_description)
+            tuples, i.e. the arguments of execute_tests
         
-        # Run appropriate test command based on language
-        return run_language_specific_tests(
-            language, 
-            test_file_path, 
-            impl_file_path, 
-            temp_dir, 
-            iteration,
-            task_description
-        )
+    Returns:
+        One entry per job, in order: the job's TestExecutionResult, or the
+        exception it raised
+    """
+    if not jobs:
+        return []
+    logger.info(f"Executing {len(jobs)} test jobs in parallel")
+    
+    temp_dir = _make_job_dir("batch")
+    
+    def run_job(index: int, job: Tuple[str, str, str, int, str]) -> TestExecutionResult:
+        job_dir = os.path.join(temp_dir, f"job_{index}")
+        os.mkdir(job_dir)
+        return _run_tests_in_dir(job_dir, *job)
+    
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(len(jobs), TEST_BATCH_WORKERS))) as executor:
+            futures = [executor.submit(run_job, index, job) for index, job in enumerate(jobs)]
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(e)
+            return results
+    finally:
+        _discard_job_dir(temp_dir)
+
+def _run_tests_in_dir(work_dir: str, test_code: str, implementation_code: str, language: str,
+                      iteration: int, task_description: str) -> TestExecutionResult:
+    """Write the implementation and test files into work_dir and run the tests there"""
+    language = language.lower()
+    ext = _FILE_EXTENSIONS.get(language, ".txt")
+    
+    # Create implementation file
+    impl_file_path = os.path.join(work_dir, f"implementation{ext}")
+    Path(impl_file_path).write_bytes(implementation_code.encode("utf-8"))
+    
+    # Create test file - adjust imports/includes to reference the implementation file
+    test_file = adjust_test_imports(test_code, language, "implementation")
+    test_file_path = os.path.join(work_dir, f"test{ext}")
+    Path(test_file_path).write_bytes(test_file.encode("utf-8"))
+    
+    # Run appropriate test command based on language
+    return run_language_specific_tests(
+        language, 
+        test_file_path, 
+        impl_file_path, 
+        work_dir, 
+        iteration,
+        task_description,
+        test_code=test_file,
+        impl_code=implementation_code
+    )
+
+def _adjust_python_imports(test_code: str, impl_module_name: str) -> str:
+    # Check if there are import statements to replace
+    if _PY_ANY_IMPORT_RE.search(test_code):
+        # Replace existing imports
+        test_code = _PY_FROM_IMPORT_RE.sub(f"from {impl_module_name} import", test_code)
+        return _PY_IMPORT_RE.sub(f"import {impl_module_name}", test_code)
+    # Add import at the beginning
+    return f"from {impl_module_name} import *\n\n" + test_code
+
+def _adjust_js_imports(test_code: str, impl_module_name: str, default_import: str) -> str:
+    # Check if there are require/import statements to replace
+    if _JS_ANY_IMPORT_RE.search(test_code):
+        # Replace existing imports
+        return _JS_IMPORT_FROM_RE.sub(f"\\1 from './{impl_module_name}'", test_code)
+    # Add import at the beginning
+    return default_import + test_code
+
+def _adjust_javascript_imports(test_code: str, impl_module_name: str) -> str:
+    return _adjust_js_imports(
+        test_code, impl_module_name,
+        f"const {{ ...implementation }} = require('./{impl_module_name}');\n\n"
+    )
+
+def _adjust_typescript_imports(test_code: str, impl_module_name: str) -> str:
+    return _adjust_js_imports(
+        test_code, impl_module_name,
+        f"import * as implementation from './{impl_module_name}';\n\n"
+    )
+
+def _adjust_cpp_includes(test_code: str, impl_module_name: str) -> str:
+    # Include the implementation header
+    if not "#include \"implementation.h\"" in test_code:
+        test_code = f"#include \"implementation.h\"\n" + test_code
+    return test_code
+
+# Import adjusters per language; other languages keep their imports as-is,
+# assuming they'll be handled by the build system
+_IMPORT_ADJUSTERS: Dict[str, Callable[[str, str], str]] = {
+    "python": _adjust_python_imports,
+    "javascript": _adjust_javascript_imports,
+    "typescript": _adjust_typescript_imports,
+    "cpp": _adjust_cpp_includes
+}
 
 def adjust_test_imports(test_code: str, language: str, impl_module_name: str) -> str:
     """
@@ -141,52 +514,14 @@ def adjust_test_imports(test_code: str, language: str, impl_module_name: str) ->
     Returns:
         Updated test code with corrected imports
     """
-    if language.lower() == "python":
-        # Check if there are import statements to replace
-        if re.search(r"from\s+\w+\s+import|import\s+\w+", test_code):
-            # Replace existing imports
-            test_code = re.sub(
-                r"from\s+(\w+)\s+import", 
-                f"from {impl_module_name} import", 
-                test_code
-            )
-            test_code = re.sub(
-                r"import\s+(\w+)", 
-                f"import {impl_module_name}", 
-                test_code
-            )
-        else:
-            # Add import at the beginning
-            test_code = f"from {impl_module_name} import *\n\n" + test_code
-            
-    elif language.lower() in ["javascript", "typescript"]:
-        # Check if there are require/import statements to replace
-        if re.search(r"(require|import)\s+.*from", test_code):
-            # Replace existing imports
-            test_code = re.sub(
-                r"(require|import)\s+.*from\s+['\"]([^'\"]+)['\"]", 
-                f"\\1 from './{impl_module_name}'", 
-                test_code
-            )
-        else:
-            # Add import at the beginning
-            if language.lower() == "javascript":
-                test_code = f"const {{ ...implementation }} = require('./{impl_module_name}');\n\n" + test_code
-            else:
-                test_code = f"import * as implementation from './{impl_module_name}';\n\n" + test_code
-                
-    elif language.lower() == "cpp":
-        # Include the implementation header
-        if not "#include \"implementation.h\"" in test_code:
-            test_code = f"#include \"implementation.h\"\n" + test_code
-            
-    # For other languages, keeping imports as-is, assuming they'll be handled by the build system
-    
-    return test_code
+    adjuster = _IMPORT_ADJUSTERS.get(language.lower())
+    return adjuster(test_code, impl_module_name) if adjuster else test_code
 
 def run_language_specific_tests(language: str, test_file_path: str, 
                                impl_file_path: str, work_dir: str,
-                               iteration: int, task_description: str) -> TestExecutionResult:
+                               iteration: int, task_description: str,
+                               test_code: Optional[str] = None,
+                               impl_code: Optional[str] = None) -> TestExecutionResult:
     """
     Run tests for a specific language
     
@@ -197,37 +532,68 @@ def run_language_specific_tests(language: str, test_file_path: str,
         work_dir: Working directory
         iteration: TDD iteration
         task_description: Task description
+        test_code: Contents of the test file, if already in memory
+        impl_code: Contents of the implementation file, if already in memory
         
     Returns:
         TestExecutionResult object with execution results
     """
     language = language.lower()
     
+    # Prefer a warm runner process when the language has one
+    pool = get_persistent_runner_pool(language)
+    if pool is not None:
+        try:
+            with pool.checkout() as runner:
+                start_time = time.monotonic()
+                worker_result = runner.run({"test_file": test_file_path, "work_dir": work_dir}, timeout=30)
+            execution_time = time.monotonic() - start_time
+            counts = None
+            if "passed" in worker_result and "failed" in worker_result:
+                counts = (worker_result["passed"], worker_result["failed"])
+            result = parse_test_output(
+                language,
+                worker_result.get("output", ""),
+                test_file_path,
+                impl_file_path,
+                execution_time,
+                counts=counts
+            )
+            # A test file that couldn't be collected fails the run, whatever else passed
+            if worker_result.get("errors"):
+                result.success = False
+            return result
+        except subprocess.TimeoutExpired:
+            logger.error(f"Test execution timed out for {language}")
+            return TestExecutionResult(
+                success=False,
+                errors=["Test execution timed out"],
+                test_file_path=test_file_path,
+                implementation_file_path=impl_file_path
+            )
+        except RuntimeError as e:
+            logger.warning(f"Persistent {language} test runner failed, falling back to a subprocess: {e}")
+    
     # Get appropriate test command for the language
     test_command, test_env = get_test_command(language, test_file_path, impl_file_path, work_dir)
     
     if not test_command:
         # If we can't determine a test command, return a simulated result
-        return simulate_test_execution(test_file_path, impl_file_path, language, iteration, task_description)
+        return simulate_test_execution(
+            test_file_path, impl_file_path, language, iteration, task_description,
+            test_code=test_code, impl_code=impl_code
+        )
     
     # Execute the test command
     try:
-        start_time = __import__('time').time()
-        process = subprocess.run(
-            test_command,
-            env=test_env,
-            shell=True,
-            cwd=work_dir,
-            capture_output=True,
-            text=True,
-            timeout=30  # Timeout after 30 seconds
-        )
-        execution_time = __import__('time').time() - start_time
+        start_time = time.monotonic()
+        output = _run_test_command(test_command, test_env, work_dir, timeout=30)  # Timeout after 30 seconds
+        execution_time = time.monotonic() - start_time
         
         # Parse test output
         return parse_test_output(
             language, 
-            process.stdout + process.stderr, 
+            output, 
             test_file_path, 
             impl_file_path,
             execution_time
@@ -249,8 +615,264 @@ def run_language_specific_tests(language: str, test_file_path: str,
             implementation_file_path=impl_file_path
         )
 
+def _run_test_command(argv: List[str], env: Dict[str, str], cwd: str, timeout: float) -> str:
+    """
+    Run a test command and return its combined stdout and stderr
+    
+    The output is read in blocks as the command produces it, with stderr
+    merged into stdout so the two stay in order. The command runs in its own
+    process group so a timeout also kills any processes it started.
+    
+    Raises:
+        subprocess.TimeoutExpired: if the command doesn't finish within timeout seconds
+    """
+    process = subprocess.Popen(
+        argv,
+        env=env,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        start_new_session=True
+    )
+    timed_out = threading.Event()
+    
+    def kill_process_group():
+        timed_out.set()
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+    
+    timer = threading.Timer(timeout, kill_process_group)
+    timer.start()
+    chunks = []
+    try:
+        with process.stdout:
+            for chunk in iter(lambda: process.stdout.read(_OUTPUT_BLOCK_SIZE), b""):
+                chunks.append(chunk)
+        process.wait()
+    finally:
+        timer.cancel()
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(argv, timeout)
+    return b"".join(chunks).decode("utf-8", errors="replace")
+
+# Heads of C++ definitions recognized by _scan_cpp_declarations
+_CPP_SCOPE_HEAD_RE = re.compile(r'(?:inline\s+)?namespace\b|extern\s*"C"')
+_CPP_TYPE_HEAD_RE = re.compile(r"(?:typedef\s+)?(?:template\s*<[^{};]*>\s*)?(?:class|struct|union|enum)\b")
+_CPP_IDENTIFIER_RE = re.compile(r"[A-Za-z_][\w:]*")
+
+def _is_cpp_function_head(head: str) -> bool:
+    """Whether the text before a top-level '{' is a free function signature"""
+    paren = head.find("(")
+    if paren <= 0 or not head.rstrip().endswith((")", "const", "noexcept")) and "->" not in head:
+        return False
+    before = head[:paren].rstrip()
+    if "=" in before:
+        # A variable initialized with a lambda or braces, not a function
+        return False
+    names = _CPP_IDENTIFIER_RE.findall(before)
+    # Needs a return type before the name; qualified names are out-of-class
+    # member definitions that the class definition already declares
+    return len(names) >= 2 and "::" not in names[-1]
+
+def _scan_cpp_declarations(src: str) -> Iterator[str]:
+    """
+    Yield what a header needs from a C++ implementation file
+    
+    Walks the source once, skipping comments and literals and tracking
+    brace and parenthesis depth. At namespace scope it yields #include
+    directives, a prototype for each free function definition and the full
+    text of each class/struct/union/enum definition. Namespaces and
+    extern "C" blocks are reproduced around their contents.
+    
+    Args:
+        src: C++ source code
+        
+    Yields:
+        Header snippets in source order
+    """
+    n = len(src)
+    i = 0
+    depth = 0                 # current brace depth
+    paren = 0                 # current parenthesis depth
+    scopes: List[int] = []    # brace depths of open namespace / extern "C" blocks
+    head_start = 0            # start of the current top-level statement
+    type_start = None         # start of a type definition whose text is being collected
+    
+    while i < n:
+        c = src[i]
+        at_scope = depth == len(scopes) and type_start is None
+        if c == "/" and src.startswith("//", i):
+            end = src.find("\n", i)
+            end = n if end < 0 else end
+            if at_scope and not src[head_start:i].strip():
+                head_start = end
+            i = end
+            continue
+        if c == "/" and src.startswith("/*", i):
+            end = src.find("*/", i + 2)
+            end = n if end < 0 else end + 2
+            if at_scope and not src[head_start:i].strip():
+                head_start = end
+            i = end
+            continue
+        if c == '"' or (c == "'" and not (i and src[i - 1].isalnum())):
+            # String or character literal (a quote after a digit is a digit separator)
+            i += 1
+            while i < n and src[i] != c:
+                i += 2 if src[i] == "\\" else 1
+            i += 1
+            continue
+        if c == "#" and not src[src.rfind("\n", 0, i) + 1:i].strip():
+            # Preprocessor directive, including backslash continuations
+            end = i
+            while True:
+                end = src.find("\n", end)
+                if end < 0 or src[end - 1] != "\\":
+                    break
+                end += 1
+            end = n if end < 0 else end
+            if at_scope:
+                directive = src[i:end].strip()
+                if directive.startswith("#include"):
+                    yield directive
+                head_start = end
+            i = end
+            continue
+        
+        if c == "(":
+            paren += 1
+        elif c == ")":
+            paren = max(0, paren - 1)
+        elif c == ";" and paren == 0 and at_scope:
+            head_start = i + 1
+        elif c == "{" and paren == 0:
+            if at_scope:
+                head = src[head_start:i].strip()
+                if _CPP_SCOPE_HEAD_RE.match(head):
+                    yield f"{head} {{"
+                    scopes.append(depth + 1)
+                    head_start = i + 1
+                elif _CPP_TYPE_HEAD_RE.match(head):
+                    type_start = head_start
+                elif _is_cpp_function_head(head):
+                    yield f"{head};"
+            depth += 1
+        elif c == "}" and paren == 0:
+            depth -= 1
+            if scopes and scopes[-1] == depth + 1:
+                scopes.pop()
+                yield "}"
+                head_start = i + 1
+            elif depth == len(scopes):
+                if type_start is not None:
+                    # A type definition runs to the ';' after its closing brace
+                    end = src.find(";", i)
+                    end = n if end < 0 else end + 1
+                    yield src[type_start:end].strip()
+                    type_start = None
+                    i = end
+                    head_start = end
+                    continue
+                head_start = i + 1
+        i += 1
+
+def _terminate_process_group(process: subprocess.Popen):
+    """Stop a build process and the compilers it started, if it is still running"""
+    if process.poll() is None:
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except OSError:
+            pass
+
+def _run_build_steps(steps: List[Tuple[List[str], Optional[str]]],
+                     processes: Optional[List[subprocess.Popen]] = None,
+                     cancelled: Optional[threading.Event] = None,
+                     lock: Optional[threading.Lock] = None) -> bool:
+    """
+    Run build commands one after another, stopping at the first failure
+    
+    Args:
+        steps: (argv, cwd) for each command
+        processes: Optional list that each started process is added to, so
+            another thread can terminate it
+        cancelled: Optional event that stops the build before its next command
+        lock: Lock guarding processes and cancelled, when they are shared
+        
+    Returns:
+        True if every command succeeded
+    """
+    guard = lock if lock is not None else contextlib.nullcontext()
+    for argv, cwd in steps:
+        if cancelled is not None and cancelled.is_set():
+            return False
+        try:
+            # Own process group, so a cancelled build can stop the compilers it started
+            process = subprocess.Popen(argv, cwd=cwd, start_new_session=True)
+        except OSError:
+            return False
+        if processes is not None:
+            with guard:
+                processes.append(process)
+                # Cancelled while starting: the canceller's snapshot of processes
+                # missed this one, so stop it here
+                stopped = cancelled is not None and cancelled.is_set()
+            if stopped:
+                _terminate_process_group(process)
+                process.wait()
+                return False
+        if process.wait() != 0:
+            return False
+    return True
+
+def _race_builds(builds: List[Tuple[List[Tuple[List[str], Optional[str]]], str]]) -> Optional[str]:
+    """
+    Run alternative builds in parallel and return the artifact of the first one to succeed
+    
+    The remaining builds are stopped as soon as one succeeds.
+    
+    Args:
+        builds: (steps, artifact path) for each build; see _run_build_steps
+        
+    Returns:
+        The artifact path of the winning build, or None if every build failed
+    """
+    processes: List[subprocess.Popen] = []
+    cancelled = threading.Event()
+    lock = threading.Lock()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(builds)) as executor:
+        futures = {
+            executor.submit(_run_build_steps, steps, processes, cancelled, lock): artifact
+            for steps, artifact in builds
+        }
+        for future in concurrent.futures.as_completed(futures):
+            if future.result():
+                # Any process started after this snapshot sees cancelled and stops itself
+                with lock:
+                    cancelled.set()
+                    running = list(processes)
+                for process in running:
+                    _terminate_process_group(process)
+                return futures[future]
+    return None
+
+@lru_cache(maxsize=64)
+def _build_cpp_header(impl_content: str) -> bytes:
+    """
+    Build the implementation header for a C++ implementation
+    
+    Cached by implementation source, so TDD iterations that only change the
+    tests don't rescan an unchanged implementation.
+    """
+    # Copy includes, function prototypes and type definitions from the implementation
+    header_parts = ["// Implementation Header\n", "#pragma once\n\n"]
+    for declaration in _scan_cpp_declarations(impl_content):
+        header_parts.append(f"{declaration}\n\n")
+    return "".join(header_parts).encode("utf-8")
+
 def get_test_command(language: str, test_file_path: str, 
-                    impl_file_path: str, work_dir: str) -> Tuple[str, Dict[str, str]]:
+                    impl_file_path: str, work_dir: str) -> Tuple[List[str], Dict[str, str]]:
     """
     Get the command to run tests for a specific language
     
@@ -261,27 +883,28 @@ def get_test_command(language: str, test_file_path: str,
         work_dir: Working directory
         
     Returns:
-        Tuple of (command_string, environment_variables)
+        Tuple of (command argv, environment_variables); the argv is empty if
+        the tests can't be run
     """
     env = os.environ.copy()
     
     if language == "python":
         # Use pytest to run the tests
-        return (f"python -m pytest {test_file_path} -v", env)
+        return (_PYTEST + [test_file_path, "-v"], env)
         
     elif language in ["javascript", "typescript"]:
         if language == "typescript":
             # First compile TypeScript to JavaScript
-            compile_cmd = f"tsc {test_file_path} {impl_file_path} --outDir {work_dir}/compiled"
+            compile_cmd = [_TSC, test_file_path, impl_file_path, "--outDir", os.path.join(work_dir, "compiled")]
             try:
-                subprocess.run(compile_cmd, shell=True, cwd=work_dir, check=True)
+                subprocess.run(compile_cmd, cwd=work_dir, check=True)
                 # Run Jest on the compiled JavaScript
-                return (f"npx jest {work_dir}/compiled/test.js --verbose", env)
-            except subprocess.CalledProcessError:
-                return (f"npx ts-node {test_file_path}", env)
+                return ([_NPX, "jest", os.path.join(work_dir, "compiled", "test.js"), "--verbose"], env)
+            except (subprocess.CalledProcessError, OSError):
+                return ([_NPX, "ts-node", test_file_path], env)
         else:
             # Run Jest directly on JavaScript
-            return (f"npx jest {test_file_path} --verbose", env)
+            return ([_NPX, "jest", test_file_path, "--verbose"], env)
             
     elif language == "cpp":
         # Compile and run the C++ tests
@@ -290,86 +913,57 @@ def get_test_command(language: str, test_file_path: str,
         
         # Create a simple CMakeLists.txt file
         cmake_file = os.path.join(work_dir, "CMakeLists.txt")
-        with open(cmake_file, 'w') as f:
-            f.write(f"""
-cmake_minimum_required(VERSION 3.10)
-project(TestProject)
-
-set(CMAKE_CXX_STANDARD 23)
-set(CMAKE_CXX_STANDARD_REQUIRED ON)
-
-# Google Test
-find_package(GTest QUIET)
-if(GTest_FOUND)
-    enable_testing()
-    add_executable(test_runner {test_file_path})
-    target_link_libraries(test_runner GTest::GTest GTest::Main)
-    add_test(NAME TestSuite COMMAND test_runner)
-else()
-    message(STATUS "Google Test not found, skipping tests")
-endif()
-            """)
+        Path(cmake_file).write_bytes(_CMAKE_TEMPLATE.format(test_file=test_file_path).encode("utf-8"))
         
         # Create a header file for the implementation
         impl_header = os.path.join(work_dir, "implementation.h")
-        with open(impl_header, 'w') as f:
-            f.write(f"// Implementation Header\n")
-            f.write(f"#pragma once\n\n")
-            # Extract declarations from implementation and add them to the header
-            # This is a simple approach that may need refinement
-            with open(impl_file_path, 'r') as impl_f:
-                impl_content = impl_f.read()
-                # Extract function, class, and template declarations
-                declarations = re.findall(r"(template\s*<.*>)?\s*(class|struct|enum|union|void|int|char|bool|double|float|auto|std::[:\w<>]+|[A-Za-z_][\w<>:]*)\s+([A-Za-z_][\w]*)\s*\([^;{]*\)\s*(?:const|noexcept|override|final|=\s*default|=\s*delete|=\s*0)?(?:\s*->.*?)?\s*(?=\{)", impl_content)
-                for decl in declarations:
-                    template_part, return_type, func_name = decl
-                    # Find the full function declaration including parameters
-                    full_decl = re.search(f"{template_part}\\s*{return_type}\\s+{func_name}\\s*\\([^{{;]*\\)\\s*(?:const|noexcept|override|final|=\\s*default|=\\s*delete|=\\s*0)?(?:\\s*->.*?)?\\s*{{", impl_content)
-                    if full_decl:
-                        f.write(f"{full_decl.group(0)[:-1]};\n\n")
-                
-                # Extract class definitions
-                class_defs = re.findall(r"(template\s*<.*>)?\s*(class|struct)\s+([A-Za-z_][\w]*)\s*(?::\s*(?:public|protected|private)\s+[A-Za-z_][\w:]*\s*)?(?=\{)", impl_content)
-                for class_def in class_defs:
-                    template_part, class_type, class_name = class_def
-                    # Find the full class definition
-                    full_class = re.search(f"{template_part}\\s*{class_type}\\s+{class_name}\\s*(?::\\s*(?:public|protected|private)\\s+[A-Za-z_][\\w:]*\\s*)?{{(.*?)}}\\s*;", impl_content, re.DOTALL)
-                    if full_class:
-                        f.write(f"{full_class.group(0)}\n\n")
+        with open(impl_file_path, 'r') as impl_f:
+            impl_content = impl_f.read()
+        Path(impl_header).write_bytes(_build_cpp_header(impl_content))
             
+        cmake_steps = [([_CMAKE, ".."], build_dir), ([_MAKE], build_dir)]
+        cmake_runner = os.path.join(build_dir, "test_runner")
+        
+        # Direct compilation as fallback
+        test_runner = os.path.join(work_dir, "test_runner")
+        compile_cmd = [_GXX, "-std=c++23", "-o", test_runner, test_file_path, impl_file_path,
+                       "-lgtest", "-lgtest_main", "-pthread"]
+        gxx_steps = [(compile_cmd, None)]
+        
+        if SPECULATIVE_CPP_BUILDS:
+            # Start both builds at once and take whichever succeeds first
+            winner = _race_builds([(cmake_steps, cmake_runner), (gxx_steps, test_runner)])
+            if winner is None:
+                logger.error("CMake build and direct compilation both failed")
+                return ([], {})
+            return ([winner], env)
+        
         # Try running CMake build
-        try:
-            build_cmd = f"cd {build_dir} && cmake .. && make"
-            subprocess.run(build_cmd, shell=True, check=True)
-            return (f"cd {build_dir} && ./test_runner", env)
-        except subprocess.CalledProcessError:
-            logger.warning("CMake build failed, trying direct compilation instead")
-            
-            # Direct compilation as fallback
-            compile_cmd = f"g++ -std=c++23 -o {work_dir}/test_runner {test_file_path} {impl_file_path} -lgtest -lgtest_main -pthread"
-            try:
-                subprocess.run(compile_cmd, shell=True, check=True)
-                return (f"{work_dir}/test_runner", env)
-            except subprocess.CalledProcessError:
-                logger.error("Direct compilation failed as well")
-                return ("", {})
+        if _run_build_steps(cmake_steps):
+            return ([cmake_runner], env)
+        logger.warning("CMake build failed, trying direct compilation instead")
+        if _run_build_steps(gxx_steps):
+            return ([test_runner], env)
+        logger.error("Direct compilation failed as well")
+        return ([], {})
                 
     elif language == "java":
         # For Java, we need to compile first
         class_name = extract_class_name(test_file_path)
-        compile_cmd = f"javac -d {work_dir} {test_file_path} {impl_file_path}"
+        compile_cmd = [_JAVAC, "-d", work_dir, test_file_path, impl_file_path]
         try:
-            subprocess.run(compile_cmd, shell=True, check=True)
+            subprocess.run(compile_cmd, check=True)
             # Use JUnit to run tests if extracted class name
             if class_name:
-                return (f"java -cp {work_dir}:$CLASSPATH org.junit.runner.JUnitCore {class_name}", env)
+                classpath = os.pathsep.join([work_dir, env.get("CLASSPATH", "")])
+                return ([_JAVA, "-cp", classpath, "org.junit.runner.JUnitCore", class_name], env)
             else:
-                return ("", {})
-        except subprocess.CalledProcessError:
-            return ("", {})
+                return ([], {})
+        except (subprocess.CalledProcessError, OSError):
+            return ([], {})
     
     # Add support for more languages as needed
-    return ("", {})  # No command available for this language
+    return ([], {})  # No command available for this language
 
 def extract_class_name(file_path: str) -> Optional[str]:
     """Extract the fully qualified class name from a Java file"""
@@ -377,11 +971,11 @@ def extract_class_name(file_path: str) -> Optional[str]:
         with open(file_path, 'r') as f:
             content = f.read()
             # Extract package if present
-            package_match = re.search(r"package\s+([a-zA-Z0-9_.]+);", content)
+            package_match = _JAVA_PACKAGE_RE.search(content)
             package = package_match.group(1) + "." if package_match else ""
             
             # Extract class name
-            class_match = re.search(r"public\s+class\s+([a-zA-Z0-9_]+)", content)
+            class_match = _JAVA_PUBLIC_CLASS_RE.search(content)
             if class_match:
                 return package + class_match.group(1)
     except Exception:
@@ -389,7 +983,8 @@ def extract_class_name(file_path: str) -> Optional[str]:
     return None
 
 def parse_test_output(language: str, output: str, test_file_path: str, 
-                     impl_file_path: str, execution_time: float) -> TestExecutionResult:
+                     impl_file_path: str, execution_time: float,
+                     counts: Optional[Tuple[int, int]] = None) -> TestExecutionResult:
     """
     Parse test output to extract test results
     
@@ -399,6 +994,8 @@ def parse_test_output(language: str, output: str, test_file_path: str,
         test_file_path: Path to the test file
         impl_file_path: Path to the implementation file
         execution_time: Time taken to execute the tests
+        counts: (passed, failed) reported by the test runner itself; when given,
+            the summary isn't parsed from the output
         
     Returns:
         TestExecutionResult object with parsed results
@@ -413,108 +1010,157 @@ def parse_test_output(language: str, output: str, test_file_path: str,
     )
     
     # Parse based on language/test framework
-    if language == "python":
-        # Parse pytest output
-        # Example: "5 passed, 2 failed in 0.03s"
-        summary_match = re.search(r"(\d+) passed,?\s*(\d+) failed", output)
-        if summary_match:
-            passed = int(summary_match.group(1))
-            failed = int(summary_match.group(2))
-            result.passed_tests = passed
-            result.failed_tests = failed
-            result.total_tests = passed + failed
-            result.success = failed == 0
-        else:
-            # Alternative pattern: "5 passed in 0.03s"
-            passed_only = re.search(r"(\d+) passed", output)
-            if passed_only:
-                passed = int(passed_only.group(1))
-                result.passed_tests = passed
-                result.total_tests = passed
-                result.success = True
-                
-    elif language in ["javascript", "typescript"]:
-        # Parse Jest output
-        # Example: "Tests: 3 passed, 1 failed, 4 total"
-        summary_match = re.search(r"Tests:.*?(\d+) passed,.*?(\d+) failed,.*?(\d+) total", output)
-        if summary_match:
-            result.passed_tests = int(summary_match.group(1))
-            result.failed_tests = int(summary_match.group(2))
-            result.total_tests = int(summary_match.group(3))
-            result.success = result.failed_tests == 0
-    
-    elif language == "cpp":
-        # Parse Google Test output
-        # Example: "[==========] 4 tests from 1 test suite ran."
-        total_match = re.search(r"\[==========\]\s*(\d+) tests", output)
-        if total_match:
-            result.total_tests = int(total_match.group(1))
-            
-            # Count passed tests
-            passed_match = re.search(r"\[  PASSED  \]\s*(\d+) tests?", output)
-            result.passed_tests = int(passed_match.group(1)) if passed_match else 0
+    if counts is not None:
+        passed, failed = counts
+        result.passed_tests = passed
+        result.failed_tests = failed
+        result.total_tests = passed + failed
+        result.success = failed == 0 and passed > 0
+        parsed = True
+    else:
+        parser = _OUTPUT_PARSERS.get(language.lower())
+        parsed = parser is not None and parser(output, result)
             
-            # Calculate failed tests
+    # Default case - extract common patterns if language-specific parsing didn't work
+    if not parsed:
+        _parse_generic_output(output, result)
+        
+    return _extract_errors(output, result)
+
+def _parse_pytest_output(output: str, result: TestExecutionResult) -> bool:
+    # Parse pytest output
+    # Example: "5 passed, 2 failed in 0.03s"
+    summary_match = _PYTEST_SUMMARY_RE.search(output)
+    if summary_match:
+        passed = int(summary_match.group(1))
+        failed = int(summary_match.group(2))
+        result.passed_tests = passed
+        result.failed_tests = failed
+        result.total_tests = passed + failed
+        result.success = failed == 0
+        return True
+    # Alternative pattern: "5 passed in 0.03s"
+    passed_only = _PYTEST_PASSED_RE.search(output)
+    if passed_only:
+        passed = int(passed_only.group(1))
+        result.passed_tests = passed
+        result.total_tests = passed
+        result.success = True
+        return True
+    return False
+
+def _parse_jest_output(output: str, result: TestExecutionResult) -> bool:
+    # Parse Jest output
+    # Example: "Tests: 3 passed, 1 failed, 4 total"
+    summary_match = _JEST_SUMMARY_RE.search(output)
+    if summary_match:
+        result.passed_tests = int(summary_match.group(1))
+        result.failed_tests = int(summary_match.group(2))
+        result.total_tests = int(summary_match.group(3))
+        result.success = result.failed_tests == 0
+        return True
+    return False
+
+def _parse_gtest_output(output: str, result: TestExecutionResult) -> bool:
+    # Parse Google Test output
+    # Example: "[==========] 4 tests from 1 test suite ran."
+    total_match = _GTEST_TOTAL_RE.search(output)
+    if total_match:
+        result.total_tests = int(total_match.group(1))
+        
+        # Count passed tests
+        passed_match = _GTEST_PASSED_RE.search(output)
+        result.passed_tests = int(passed_match.group(1)) if passed_match else 0
+        
+        # Calculate failed tests
+        result.failed_tests = result.total_tests - result.passed_tests
+        result.success = result.failed_tests == 0
+        return True
+    return False
+
+def _parse_junit_output(output: str, result: TestExecutionResult) -> bool:
+    # Parse JUnit output
+    # Example: "Tests run: 4, Failures: 1, Errors: 0"
+    junit_match = _JUNIT_SUMMARY_RE.search(output)
+    if junit_match:
+        total = int(junit_match.group(1))
+        failures = int(junit_match.group(2))
+        errors = int(junit_match.group(3))
+        
+        result.total_tests = total
+        result.failed_tests = failures + errors
+        result.passed_tests = total - (failures + errors)
+        result.success = (failures + errors) == 0
+        return True
+    return False
+
+def _parse_generic_output(output: str, result: TestExecutionResult):
+    # Look for common patterns in test output
+    # "N tests", "N passing", "N failing", etc.
+    # One scan picks up the first count of each kind
+    first_counts = {}
+    for match in _GENERIC_COUNTS_RE.finditer(output):
+        first_counts.setdefault(match.lastgroup, int(match.group(1)))
+        if len(first_counts) == 3:
+            break
+    result.total_tests = first_counts.get("total", result.total_tests)
+    result.passed_tests = first_counts.get("passed", result.passed_tests)
+    result.failed_tests = first_counts.get("failed", result.failed_tests)
+        
+    # If we have total but not passed/failed, calculate the missing value
+    if result.total_tests > 0:
+        if result.passed_tests == 0 and result.failed_tests == 0:
+            # If output contains "success" or similar, assume all passed
+            if _GENERIC_SUCCESS_RE.search(output):
+                result.passed_tests = result.total_tests
+                result.success = True
+        elif result.passed_tests > 0 and result.failed_tests == 0:
             result.failed_tests = result.total_tests - result.passed_tests
             result.success = result.failed_tests == 0
-    
-    elif language == "java":
-        # Parse JUnit output
-        # Example: "Tests run: 4, Failures: 1, Errors: 0"
-        junit_match = re.search(r"Tests run: (\d+), Failures: (\d+), Errors: (\d+)", output)
-        if junit_match:
-            total = int(junit_match.group(1))
-            failures = int(junit_match.group(2))
-            errors = int(junit_match.group(3))
-            
-            result.total_tests = total
-            result.failed_tests = failures + errors
-            result.passed_tests = total - (failures + errors)
-            result.success = (failures + errors) == 0
-            
-    # Default case - extract common patterns if language-specific parsing didn't work
-    if result.total_tests == 0:
-        # Look for common patterns in test output
-        # "N tests", "N passing", "N failing", etc.
-        test_count = re.search(r"(\d+)(?:\s+|-)(?:tests?|specs?)", output, re.IGNORECASE)
-        if test_count:
-            result.total_tests = int(test_count.group(1))
-            
-        pass_count = re.search(r"(\d+)(?:\s+|-)(?:passing|passed|ok)", output, re.IGNORECASE)
-        if pass_count:
-            result.passed_tests = int(pass_count.group(1))
-            
-        fail_count = re.search(r"(\d+)(?:\s+|-)(?:failing|failed|errors?|broken)", output, re.IGNORECASE)
-        if fail_count:
-            result.failed_tests = int(fail_count.group(1))
-            
-        # If we have total but not passed/failed, calculate the missing value
-        if result.total_tests > 0:
-            if result.passed_tests == 0 and result.failed_tests == 0:
-                # If output contains "success" or similar, assume all passed
-                if re.search(r"success|all\s+tests\s+passed", output, re.IGNORECASE):
-                    result.passed_tests = result.total_tests
-                    result.success = True
-            elif result.passed_tests > 0 and result.failed_tests == 0:
-                result.failed_tests = result.total_tests - result.passed_tests
-                result.success = result.failed_tests == 0
-            elif result.failed_tests > 0 and result.passed_tests == 0:
-                result.passed_tests = result.total_tests - result.failed_tests
-                result.success = result.failed_tests == 0
-                
+        elif result.failed_tests > 0 and result.passed_tests == 0:
+            result.passed_tests = result.total_tests - result.failed_tests
+            result.success = result.failed_tests == 0
+
+# Summary parsers per language; each returns whether it found a summary.
+# Other languages only get the generic parser
+_OUTPUT_PARSERS: Dict[str, Callable[[str, TestExecutionResult], bool]] = {
+    "python": _parse_pytest_output,
+    "javascript": _parse_jest_output,
+    "typescript": _parse_jest_output,
+    "cpp": _parse_gtest_output,
+    "java": _parse_junit_output
+}
+
+def _extract_errors(output: str, result: TestExecutionResult) -> TestExecutionResult:
+    """Collect the output lines that mention errors or failures into result.errors"""
     # Extract error messages
     if not result.success:
+        # Limit to first 10 errors; jump from one matching line to the next
+        # instead of splitting the whole output into lines
         error_lines = []
-        for line in output.splitlines():
-            if re.search(r"error|fail|exception|assertion|FAILED", line, re.IGNORECASE):
-                error_lines.append(line.strip())
-        result.errors = error_lines[:10]  # Limit to first 10 errors
+        position = 0
+        while len(error_lines) < 10:
+            match = _ERROR_LINE_RE.search(output, position)
+            if not match:
+                break
+            # position is always at a line start, so the match's line starts
+            # after the last line break between the two
+            line_start = position
+            for line_break in _LINE_BREAK_RE.finditer(output, position, match.start()):
+                line_start = line_break.end()
+            line_break = _LINE_BREAK_RE.search(output, match.end())
+            line_end = line_break.start() if line_break else len(output)
+            error_lines.append(output[line_start:line_end].strip())
+            position = line_break.end() if line_break else len(output)
+        result.errors = error_lines
         
     return result
 
 def simulate_test_execution(test_file_path: str, impl_file_path: str, 
                            language: str, iteration: int,
-                           task_description: str) -> TestExecutionResult:
+                           task_description: str,
+                           test_code: Optional[str] = None,
+                           impl_code: Optional[str] = None) -> TestExecutionResult:
     """
     Simulate test execution when actual execution is not possible
     
@@ -524,6 +1170,8 @@ def simulate_test_execution(test_file_path: str, impl_file_path: str,
         language: Programming language
         iteration: TDD iteration
         task_description: Task description
+        test_code: Contents of the test file; read from test_file_path if not given
+        impl_code: Contents of the implementation file; read from impl_file_path if not given
         
     Returns:
         TestExecutionResult with simulated results based on test quality
@@ -531,12 +1179,14 @@ def simulate_test_execution(test_file_path: str, impl_file_path: str,
     logger.info(f"Simulating test execution for {language} (iteration {iteration})")
     
     try:
-        # Read test file and implementation file
-        with open(test_file_path, 'r') as f:
-            test_code = f.read()
+        # Read test file and implementation file unless the caller already has them
+        if test_code is None:
+            with open(test_file_path, 'r') as f:
+                test_code = f.read()
             
-        with open(impl_file_path, 'r') as f:
-            impl_code = f.read()
+        if impl_code is None:
+            with open(impl_file_path, 'r') as f:
+                impl_code = f.read()
             
         # Analyze test quality
         test_quality = evaluate_test_quality(test_code, task_description, impl_code, language)
@@ -581,41 +1231,16 @@ def count_tests(test_code: str, language: str) -> int:
     Returns:
         Number of tests
     """
-    # Define test patterns for different languages
-    test_patterns = {
-        "python": [
-            r"def\s+test_\w+\s*\(",  # pytest style
-            r"self\.assert\w+\("     # unittest style
-        ],
-        "javascript": [
-            r"it\s*\(\s*['\"]",      # Jest/Mocha style
-            r"test\s*\(\s*['\"]"     # Jest style
-        ],
-        "typescript": [
-            r"it\s*\(\s*['\"]",
-            r"test\s*\(\s*['\"]"
-        ],
-        "java": [
-            r"@Test",                # JUnit style
-            r"public\s+void\s+test\w+"
-        ],
-        "cpp": [
-            r"TEST\s*\(",            # Google Test style
-            r"TEST_F\s*\("
-        ]
-    }
-    
-    # Get patterns for the language or use a generic pattern
-    patterns = test_patterns.get(language.lower(), [r"test", r"assert"])
-    
-    # Count occurrences of test patterns
-    count = 0
-    for pattern in patterns:
-        count += len(re.findall(pattern, test_code))
+    # Count occurrences of the language's test pattern, or of the generic patterns
+    pattern = _TEST_COUNT_PATTERNS.get(language.lower())
+    if pattern is not None:
+        count = sum(1 for _ in pattern.finditer(test_code))
+    else:
+        count = sum(1 for pattern in _GENERIC_TEST_COUNT_PATTERNS for _ in pattern.finditer(test_code))
         
     # If we couldn't find any tests but there are assertions, count those
     if count == 0:
-        assertion_count = len(re.findall(r"assert|expect|should", test_code, re.IGNORECASE))
+        assertion_count = sum(1 for _ in _ASSERTION_RE.finditer(test_code))
         # Estimate test count based on assertion density
         if assertion_count > 0:
             # Assume roughly 2-3 assertions per test
@@ -641,7 +1266,7 @@ def document_test_results(execution_result: TestExecutionResult,
         A dictionary with documented test results
     """
     # Get current timestamp
-    timestamp = __import__('datetime').datetime.now().isoformat()
+    timestamp = datetime.now().isoformat()
     
     # Create documentation structure
     documentation = {
@@ -669,6 +1294,12 @@ def document_test_results(execution_result: TestExecutionResult,
     
     return documentation
 
+def _dump_report(report: Dict[str, Any]) -> bytes:
+    """Serialize a report as indented JSON, using orjson when it's installed"""
+    if orjson is not None:
+        return orjson.dumps(report, option=orjson.OPT_INDENT_2)
+    return json.dumps(report, indent=2).encode("utf-8")
+
 def generate_test_report(test_results: List[Dict[str, Any]], 
                         language: str,
                         task_description: str,
@@ -685,19 +1316,26 @@ def generate_test_report(test_results: List[Dict[str, Any]],
     Returns:
         A dictionary with the comprehensive test report
     """
-    # Calculate overall statistics
-    total_tests = sum(result["summary"]["total_tests"] for result in test_results)
-    passed_tests = sum(result["execution_result"]["passed_tests"] for result in test_results)
-    failed_tests = sum(result["execution_result"]["failed_tests"] for result in test_results)
+    # Calculate overall statistics in a single pass
+    total_tests = passed_tests = failed_tests = successful_iterations = 0
+    total_execution_time = 0
+    for result in test_results:
+        summary = result["summary"]
+        execution_result = result["execution_result"]
+        total_tests += summary["total_tests"]
+        passed_tests += execution_result["passed_tests"]
+        failed_tests += execution_result["failed_tests"]
+        total_execution_time += summary["execution_time_seconds"]
+        if summary["status"] == "PASSED":
+            successful_iterations += 1
     
     total_iterations = len(test_results)
-    successful_iterations = sum(1 for result in test_results if result["summary"]["status"] == "PASSED")
-    total_execution_time = sum(result["summary"]["execution_time_seconds"] for result in test_results)
     
     # Create report structure
+    now = datetime.now()
     report = {
-        "report_id": f"tdd_report_{__import__('datetime').datetime.now().strftime('%Y%m%d%H%M%S')}",
-        "generated_at": __import__('datetime').datetime.now().isoformat(),
+        "report_id": f"tdd_report_{now.strftime('%Y%m%d%H%M%S')}",
+        "generated_at": now.isoformat(),
         "language": language,
         "task_description": task_description,
         "overall_statistics": {
@@ -737,9 +1375,10 @@ def generate_test_report(test_results: List[Dict[str, Any]],
     # Write report to file if output path is provided
     if output_path:
         try:
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            with open(output_path, 'w') as f:
-                json.dump(report, f, indent=2)
+            report_dir = os.path.dirname(output_path)
+            if report_dir:
+                os.makedirs(report_dir, exist_ok=True)
+            Path(output_path).write_bytes(_dump_report(report))
             logger.info(f"Test report saved to {output_path}")
         except Exception as e:
             logger.error(f"Error saving test report: {e}")
@@ -10,11 +10,415 @@ test code to provide a more comprehensive assessment beyond simple pass/fail.
 import re
 import logging
 import math
-from typing import Dict, List, Any, Optional, Set, Tuple
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Any, Optional, Set, Tuple
+
+# pyahocorasick is optional: one automaton pass finds every literal test
+# type pattern at once, faster than a regex scan per category
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Sub-metrics computed by TestQualityMetrics.evaluate_test_quality
+_SUB_METRICS = frozenset({
+    "completeness", "variety", "edge_case", "assertion_density",
+    "readability", "test_isolation", "task_alignment"
+})
+
+# Result keys of evaluate_test_quality, mapped to the sub-metrics each needs
+_RESULT_DEPENDENCIES = {
+    "completeness_score": frozenset({"completeness"}),
+    "variety_score": frozenset({"variety"}),
+    "edge_case_score": frozenset({"edge_case"}),
+    "assertion_density": frozenset({"assertion_density"}),
+    "normalized_assertion_density": frozenset({"assertion_density"}),
+    "readability_score": frozenset({"readability"}),
+    "test_isolation_score": frozenset({"test_isolation"}),
+    "task_alignment_score": frozenset({"task_alignment"}),
+    "overall_quality": _SUB_METRICS,
+    "detected_language": frozenset(),
+    "strengths": _SUB_METRICS,
+    "weaknesses": _SUB_METRICS,
+    "test_count": frozenset({"completeness"}),
+    "assertion_count": frozenset({"assertion_density"})
+}
+
+# Test type categories whose presence, not count or position, is measured
+_PRESENCE_CATEGORIES = ("parameterized", "mocking", "fixtures", "performance", "security")
+
+def _build_literal_automaton(literals: Dict[str, Iterable[str]]):
+    """
+    Build an Aho-Corasick automaton over a {category: [literal, ...]} table.
+    
+    Each literal maps to the tuple of categories listing it. Returns None
+    when pyahocorasick isn't installed.
+    """
+    if ahocorasick is None:
+        return None
+    literal_categories: Dict[str, List[str]] = {}
+    for category, group in literals.items():
+        for literal in group:
+            literal_categories.setdefault(literal, []).append(category)
+    automaton = ahocorasick.Automaton()
+    for literal, categories in literal_categories.items():
+        automaton.add_word(literal, tuple(categories))
+    automaton.make_automaton()
+    return automaton
+
+# Patterns used by the metric calculations, compiled once per process
+
+# Common patterns for function definitions across languages
+_SOURCE_FUNC_PATTERNS = [
+    re.compile(r"def\s+(\w+)\s*\("),
+    re.compile(r"function\s+(\w+)\s*\("),
+    re.compile(r"(?:public|private|protected)\s+\w+\s+(\w+)\s*\("),
+    # Anchored at a word start: a match can't begin inside a word unless one
+    # also begins at its start, so this only saves the retries
+    re.compile(r"\b\w+\s+(\w+)\s*\([^)]*\)\s*\{"),
+    re.compile(r"fn\s+(\w+)\s*\("),  # Rust
+    re.compile(r"func\s+(\w+)\s*\(")  # Go
+]
+
+# Patterns that indicate a function is being tested
+_TESTED_FUNC_PATTERNS = [
+    re.compile(r"test\w*_(\w+)"),
+    re.compile(r"test\s+that\s+(\w+)"),
+    # Anchored the same way; a match may also start right where the previous
+    # one ended, after its should/must/will
+    re.compile(r"(?:\b|(?<=should)|(?<=must)|(?<=will))(\w+)\s*\([^)]*\)\s*(?:should|must|will)"),
+    re.compile(r"(?:assert|expect)[^;]*(?:\.|\s+)(\w+)\s*\(")
+]
+
+# Coverage indicators, matched against the lowercased test code
+_BRANCH_COVERAGE_RE = re.compile(r"branch\s+coverage")
+_STATEMENT_COVERAGE_RE = re.compile(r"statement\s+coverage")
+_PATH_COVERAGE_RE = re.compile(r"path\s+coverage")
+
+# Completeness score by test count when no coverage ratio is available:
+# sqrt(test_count / 10), with diminishing returns up to 10+ tests = 1.0
+_COMPLETENESS_BY_TEST_COUNT = tuple(min(1.0, math.sqrt(count / 10)) for count in range(11))
+
+_TEST_GROUPING_RE = re.compile(
+    r"(?:describe\s*\(|suite\s*\(|class\s+\w+Test|@Nested|context\s*\(|xdescribe|fdescribe)"
+)
+_DATA_DRIVEN_RE = re.compile(
+    r"(?:test.each|@TestFactory|@DataProvider|testdata|@UseDataProvider|@CsvSource|@ValueSource)"
+)
+
+# Edge case categories, matched against the lowercased test code. Every
+# category is a list of plain keywords
+_EDGE_CASE_KEYWORDS = {
+    "null_empty": ("null", "none", "empty", "undefined", "''", '""', "[]", "{}"),
+    "boundary": ("boundary", "limit", "min", "max", "zero", "negative", "upper", "lower"),
+    "error": ("exception", "error", "throw", "invalid", "fail", "panic", "crash"),
+    "large_inputs": ("large", "big", "huge", "overflow", "many", "multiple", "long"),
+    "special_chars": ("special", "character", "symbol", "unicode", "utf", "escape", "non-ascii"),
+    "performance": ("timeout", "slow", "fast", "performance", "benchmark"),
+    "concurrency": ("concurrent", "parallel", "race", "deadlock", "thread", "async", "await")
+}
+_EDGE_CASE_TYPE_PATTERNS = {
+    edge_case_type: re.compile("|".join(re.escape(keyword) for keyword in keywords))
+    for edge_case_type, keywords in _EDGE_CASE_KEYWORDS.items()
+}
+_EDGE_CASE_AUTOMATON = _build_literal_automaton(_EDGE_CASE_KEYWORDS)
+_MEMORY_SAFETY_RE = re.compile(r"(?:memory|leak|dangling|null|overflow|underflow|bound|out of bounds|buffer)")
+
+# Common assertion type patterns across languages, matched against the
+# lowercased test code
+_ASSERTION_TYPE_PATTERNS = {
+    "equality": re.compile(r"(?:equal|same|identical|matches|is)\b"),
+    "inequality": re.compile(r"(?:not\s+equal|different|not\s+same|inequality|isnot)\b"),
+    "boolean": re.compile(r"(?:true|false|asserttrue|assertfalse|istrue|isfalse)\b"),
+    "null_check": re.compile(r"(?:null|none|nil|undefined|assertnull|assertnotnull|isnull|isnotnull)\b"),
+    "exception": re.compile(r"(?:throws|exception|assertthrows|expect\w*\s*\w+\s*to\s*throw|catch|try)\b"),
+    "type_check": re.compile(r"(?:instanceof|typeof|is_a|isinstance|isinstanceof|assertinstanceof)\b"),
+    "collection": re.compile(r"(?:contains|size|length|empty|has|elements|in)\b"),
+}
+
+# Comment markers that start a comment line, by language
+_C_STYLE_COMMENT_PREFIXES = ("//", "/*")
+_COMMENT_PREFIXES = {
+    "python": ("#", '"""'),
+    "javascript": _C_STYLE_COMMENT_PREFIXES,
+    "typescript": _C_STYLE_COMMENT_PREFIXES,
+    "java": _C_STYLE_COMMENT_PREFIXES,
+    "cpp": _C_STYLE_COMMENT_PREFIXES,
+    "csharp": _C_STYLE_COMMENT_PREFIXES,
+    "rust": _C_STYLE_COMMENT_PREFIXES,
+    "go": _C_STYLE_COMMENT_PREFIXES,
+    "unknown": ("#", "//", "/*", '"""')
+}
+
+# Descriptive test names based on language
+_JS_TEST_NAME_RE = re.compile(r"(?:test|it)\s*\(\s*['\"]([^'\"]+)")
+_TEST_NAME_PATTERNS = {
+    "python": re.compile(r"def\s+test_(\w+)"),
+    "javascript": _JS_TEST_NAME_RE,
+    "typescript": _JS_TEST_NAME_RE,
+    "java": re.compile(r"(?:public|private|protected)\s+void\s+test(\w+)"),
+    "cpp": re.compile(r"TEST\s*\([^,]*,\s*(\w+)"),
+    "csharp": re.compile(r"public\s+void\s+Test(\w+)"),
+    "rust": re.compile(r"fn\s+test_(\w+)"),
+    "unknown": re.compile(r"(?:test|Test)_?(\w+)")
+}
+_CAMEL_CASE_WORD_RE = re.compile(r"[A-Z][a-z]")
+
+# Test organization based on language
+_JS_TEST_ORG_RE = re.compile(r"describe\s*\(")
+_TEST_ORG_PATTERNS = {
+    "python": re.compile(r"class\s+\w+Test"),
+    "javascript": _JS_TEST_ORG_RE,
+    "typescript": _JS_TEST_ORG_RE,
+    "java": re.compile(r"(?:public|private)\s+class\s+\w+Test"),
+    "cpp": re.compile(r"TEST_F\s*\("),
+    "csharp": re.compile(r"public\s+class\s+\w+Test"),
+    "rust": re.compile(r"mod\s+tests"),
+    "unknown": re.compile(r"(?:class|describe|module)\s+\w+")
+}
+
+def _compile_all(patterns: Dict[str, List[str]], flags: int = 0) -> Dict[str, List[re.Pattern]]:
+    """Compile every pattern of a {name: [pattern, ...]} table"""
+    return {name: [re.compile(pattern, flags) for pattern in group] for name, group in patterns.items()}
+
+def _split_literals(group: List[str]) -> Tuple[Tuple[str, ...], List[re.Pattern]]:
+    """
+    Split patterns into the plain substrings among them and the compiled rest.
+    
+    A substring check with `in` is about twice as fast as a regex search for
+    the same literal, so the substrings are checked first.
+    """
+    literals = []
+    patterns = []
+    for pattern in group:
+        text = re.sub(r"\\(.)", r"\1", pattern)
+        if re.escape(text) == pattern:
+            literals.append(text)
+        else:
+            patterns.append(re.compile(pattern))
+    return tuple(literals), patterns
+
+def _split_all(patterns: Dict[str, List[str]]) -> Dict[str, Tuple[Tuple[str, ...], List[re.Pattern]]]:
+    """Split every group of a {name: [pattern, ...]} table with _split_literals"""
+    return {name: _split_literals(group) for name, group in patterns.items()}
+
+# Setup/teardown patterns, matched against the lowercased test code; the
+# plain markers among them are split out for substring checks
+_JS_SETUP_TEARDOWN = [r"beforeeach", r"aftereach", r"beforeall", r"afterall"]
+_SETUP_TEARDOWN_PATTERNS = _split_all({
+    "python": [r"def\s+setup", r"def\s+teardown", r"@pytest.fixture"],
+    "javascript": _JS_SETUP_TEARDOWN,
+    "typescript": _JS_SETUP_TEARDOWN,
+    "java": [r"@before", r"@after", r"@beforeclass", r"@afterclass"],
+    "cpp": [r"setup\(\)", r"teardown\(\)", r"test_f"],
+    "csharp": [r"\[setup\]", r"\[teardown\]"],
+    "rust": [r"#\[fixture\]", r"mod\s+tests\s*\{"],
+    "unknown": [r"(?:setup|teardown|before|after)"]
+})
+
+# Reset patterns, matched against the lowercased test code
+_RESET_LITERALS, _RESET_PATTERNS = _split_literals([r"(?:reset|clear|clean|new)", r"mock\w*\.reset", r"restore"])
+
+# Shared state indicators. The trailing assignment target starts at a word
+# boundary (\b\w+): otherwise every backtracking step of [^\n]* retries it from
+# inside one long word, which is quadratic in the word's length
+_SHARED_STATE_PATTERNS = [
+    re.compile(pattern, re.MULTILINE)
+    for pattern in (
+        r"static\s+\w+\s*=",
+        r"let\s+\w+\s*=.+;\s*(?:\n[^\n]*){2,}\s*\b\w+\s*=",
+        r"var\s+\w+\s*=.+;\s*(?:\n[^\n]*){2,}\s*\b\w+\s*=",
+        r"(?:global|nonlocal)\s+\w+"
+    )
+]
+
+# Global variable patterns
+_JS_GLOBALS = [r"(?:var|let|const)\s+\w+\s*=.+;\s*(?:\n[^\n]*\n)[^\n]*\s*\b\w+\s*="]
+_GLOBAL_PATTERNS = _compile_all({
+    # One alternation: a failed scan for the rarer "global" no longer precedes the common case
+    "python": [r"(?:^|\s)(?:global\s+|\w+\s*=\s*(?!\s*(?:function|def|class)))"],
+    "javascript": _JS_GLOBALS,
+    "typescript": _JS_GLOBALS,
+    "java": [r"(?:static|public static|private static)\s+\w+\s+\w+\s*="],
+    "cpp": [r"(?:static|extern)\s+\w+\s+\w+\s*="],
+    "unknown": [r"(?:global|static|var|let|const)\s+\w+\s*="]
+}, re.MULTILINE)
+
+# Individual test fixture/context patterns, matched against the lowercased test code
+_FIXTURE_PATTERNS = _compile_all({
+    "python": [r"@pytest.fixture\s*def\s+\w+"],
+    "javascript": [r"describe\([^)]+,\s*function\s*\(\)\s*{[^}]*beforeeach"],
+    "java": [r"@rule\s+public\s+\w+"],
+    "cpp": [r"class\s+\w+\s*:\s*public\s+::testing::test"],
+    "unknown": [r"(?:fixture|context|describe|suite)"]
+})
+
+_TASK_TERM_RE = re.compile(r'\b\w{3,}\b')
+
+# Words too common in task descriptions to indicate alignment
+_COMMON_TASK_WORDS = frozenset({
+    'the', 'and', 'for', 'with', 'that', 'this', 
+    'implement', 'create', 'function', 'code', 'test',
+    'should', 'would', 'could', 'must', 'may', 'might'
+})
+
+# Different weights for different metrics based on importance
+# Weights for: completeness, variety, edge_cases, assertions, readability, isolation, task_alignment
+_OVERALL_QUALITY_WEIGHTS = (0.20, 0.15, 0.20, 0.15, 0.10, 0.10, 0.10)
+
+# Explicit task requirement indicators, matched against the lowercased test code.
+# Unlike the short lists above, these five \b-anchored words are much faster as
+# one alternation ("requirement_" is covered by "requirement")
+_REQ_INDICATOR_RE = re.compile(r'\b(?:requirement|req_|task_|story_|user_story)')
+
+# Patterns for different test types with enhanced language-independent patterns
+_TEST_TYPE_PATTERNS = {
+    # Unit test patterns for multiple languages
+    "unit": [
+        # Python patterns
+        r"test_\w+", r"def test_", 
+        # JavaScript/TypeScript patterns
+        r"function test", r"it\(\s*['\"]\w+", r"test\(\s*['\"]\w+",
+        # Java/C# patterns
+        r"@Test", r"void test\w+\s*\(",
+        # C++ patterns
+        r"TEST\(", r"TEST_F\(", r"BOOST_(?:AUTO_)?TEST_CASE",
+        # Rust patterns  
+        r"#\[test\]", r"fn test_\w+",
+        # Generic patterns
+        r"assert_\w+", r"check_\w+"
+    ],
+    
+    # Parameterized test patterns
+    "parameterized": [
+        # Python patterns
+        r"@parameterized", r"@pytest.mark.parametrize", 
+        # JavaScript patterns
+        r"test.each\(", r"it.each\(", 
+        # Java patterns
+        r"@ParameterizedTest", r"@CsvSource", r"@ValueSource",
+        # C++ patterns
+        r"INSTANTIATE_TEST_SUITE_P", r"TEST_P",
+        # Rust patterns
+        r"#\[rstest\]", r"#\[case\]",
+        # Generic patterns
+        r"(?:for|foreach)\s*\([^)]*\)\s*{[^}]*(?:test|assert)"
+    ],
+    
+    # Assertion patterns for multiple languages
+    "assertion": [
+        # Common across languages
+        r"assert", r"expect\(.*\).to", r"should\.", 
+        # Java/C# patterns
+        r"assertEquals", r"assertTrue", r"assertFalse", r"verify\(", 
+        # C++ patterns
+        r"ASSERT_", r"EXPECT_", r"BOOST_(?:CHECK|REQUIRE|TEST)",
+        # Rust patterns
+        r"assert!", r"assert_eq!", r"assert_ne!",
+        # Additional patterns
+        r"is_equal", r"isEqual", r"areEqual", r"notEqual",
+        r"is\s*\(", r"\.not\.", r"be\."
+    ],
+    
+    # Edge case patterns
+    "edge_case": [
+        r"edge\s*case", r"boundary", r"empty", 
+        r"null", r"nil", r"none", r"undefined", r"Option::None",
+        r"exception", r"error", r"throw", r"unwrap", r"panic", r"fail",
+        r"overflow", r"underflow", r"zero", r"NaN", r"Infinity",
+        r"max\s*value", r"min\s*value", r"INT_MAX", r"INT_MIN", r"std::numeric_limits",
+        r"special\s*character", r"unicode", r"utf", 
+        r"(?:very|too)\s*(?:large|small|long|short)"
+    ],
+    
+    # Mocking patterns for multiple languages
+    "mocking": [
+        r"mock", r"stub", r"fake", r"spy", r"dummy", r"double",
+        r"@Mock", r"createMock", r"MockBean", r"mockito", 
+        r"jest.fn", r"sinon", r"moq", r"gmock", r"test::mock",
+        r"setUp\([^)]*mock", r"setup\([^)]*mock",
+        r"patch", r"MagicMock"
+    ],
+    
+    # Test fixures/setup
+    "fixtures": [
+        r"(?:before|after)(?:Each|All)", r"setUp", r"tearDown", 
+        r"@Before", r"@After", r"@BeforeClass", r"@AfterClass",
+        r"TestFixture", r"fixture", r"FIXTURE", 
+        r"describe\([^)]*,\s*function", r"xdescribe", r"fdescribe"
+    ],
+    
+    # Performance testing
+    "performance": [
+        r"benchmark", r"perf", r"performance", r"timing", r"elapsed",
+        r"Duration", r"Stopwatch", r"time\.time", r"System\.nanoTime",
+        r"Date\.now", r"performance\.now", r"hrtime", r"clock\(\)",
+        r"CLOCK_", r"std::chrono", r"boost::timer"
+    ],
+    
+    # Security testing
+    "security": [
+        r"security", r"vulnerability", r"exploit", r"attack", r"injection",
+        r"sanitize", r"escape", r"XSS", r"CSRF", r"overflow", r"underflow",
+        r"authenticate", r"authorize", r"permission", r"privilege"
+    ]
+}
+
+# Language-specific features (to detect language and accommodate)
+_LANGUAGE_FEATURES = {
+    "python": [r"def\s+\w+", r"import\s+", r"from\s+\w+\s+import", r":\s*$", r"pytest", r"unittest"],
+    "javascript": [r"function\s+", r"const\s+", r"let\s+", r"var\s+", r"=>\s*{", r"jest", r"mocha"],
+    "typescript": [r"interface\s+", r"class\s+", r"type\s+", r":\s*\w+", r"<\w+>"],
+    "java": [r"public\s+class", r"private\s+\w+", r"protected\s+\w+", r"@Test", r"JUnit", r"TestNG"],
+    "cpp": [r"#include", r"::\s*\w+", r"std::", r"template\s*<", r"namespace", r"gtest", r"expected<", r"std::format", r"std::print", r"auto\s*\(\s*\w+\s*\)", r"if\s+consteval"],
+    "csharp": [r"namespace\s+", r"using\s+\w+;", r"public\s+(?:class|void)", r"NUnit", r"xUnit"],
+    "rust": [r"fn\s+\w+", r"let\s+mut", r"impl\s+", r"pub\s+", r"struct\s+", r"enum\s+", r"mod\s+", r"#\[test\]"],
+    "bash": [r"\[\[", r"\$\(", r"\$\{", r"function\s+\w+\s*\(\)", r"echo", r"#!/"],
+    "go": [r"func\s+\w+", r"package\s+\w+", r"import\s+\(", r"func Test\w+\(t \*testing.T\)"],
+    "ruby": [r"def\s+\w+", r"describe\s+", r"it\s+", r"require\s+", r"rspec", r"test_"]
+}
+
+# Compiled forms of the tables above, shared by every evaluator
+_TEST_TYPE_RE = _compile_all(_TEST_TYPE_PATTERNS)
+_LANGUAGE_FEATURES_RE = _compile_all(_LANGUAGE_FEATURES)
+
+def _fuse(patterns: List[str]) -> Optional[re.Pattern]:
+    """Fuse patterns into one alternation, or None if there are none"""
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns)) if patterns else None
+
+def _is_literal(pattern: str) -> bool:
+    """Whether a pattern matches only its own text"""
+    return re.escape(pattern) == pattern
+
+# Each category fused into one alternation, so checking whether any of
+# its patterns occurs takes a single scan
+_FUSED_TEST_TYPES = {category: _fuse(patterns) for category, patterns in _TEST_TYPE_PATTERNS.items()}
+
+# With pyahocorasick, the literal patterns of the presence-only categories
+# go into one automaton; only the remaining regex patterns of a category
+# still need a scan, and only if no literal was found
+_PRESENCE_AUTOMATON = _build_literal_automaton({
+    category: [pattern for pattern in _TEST_TYPE_PATTERNS[category] if _is_literal(pattern)]
+    for category in _PRESENCE_CATEGORIES
+})
+_PRESENCE_RESIDUAL_FUSED = {
+    category: _fuse([pattern for pattern in _TEST_TYPE_PATTERNS[category] if not _is_literal(pattern)])
+    for category in _PRESENCE_CATEGORIES
+}
+
+# Edge cases are located rather than just detected: the lookahead makes
+# every position where any edge case pattern starts a match. It runs on the
+# lowercased test code (the edge case patterns hold no uppercase escapes,
+# so lowercasing them is safe)
+_EDGE_CASE_STARTS_RE = re.compile(
+    "(?=" + "|".join(f"(?:{pattern.lower()})" for pattern in _TEST_TYPE_PATTERNS["edge_case"]) + ")"
+)
+
+
 class TestQualityMetrics:
     """
     Evaluates the quality of test code using various metrics
@@ -22,115 +426,13 @@ class TestQualityMetrics:
     
     def __init__(self):
         """Initialize test quality metrics"""
-        # Define patterns for different test types with enhanced language-independent patterns
-        self.test_type_patterns = {
-            # Unit test patterns for multiple languages
-            "unit": [
-                # Python patterns
-                r"test_\w+", r"def test_", 
-                # JavaScript/TypeScript patterns
-                r"function test", r"it\(\s*['\"]\w+", r"test\(\s*['\"]\w+",
-                # Java/C# patterns
-                r"@Test", r"void test\w+\s*\(",
-                # C++ patterns
-                r"TEST\(", r"TEST_F\(", r"BOOST_(?:AUTO_)?TEST_CASE",
-                # Rust patterns  
-                r"#\[test\]", r"fn test_\w+",
-                # Generic patterns
-                r"assert_\w+", r"check_\w+"
-            ],
-            
-            # Parameterized test patterns
-            "parameterized": [
-                # Python patterns
-                r"@parameterized", r"@pytest.mark.parametrize", 
-                # JavaScript patterns
-                r"test.each\(", r"it.each\(", 
-                # Java patterns
-                r"@ParameterizedTest", r"@CsvSource", r"@ValueSource",
-                # C++ patterns
-                r"INSTANTIATE_TEST_SUITE_P", r"TEST_P",
-                # Rust patterns
-                r"#\[rstest\]", r"#\[case\]",
-                # Generic patterns
-                r"(?:for|foreach)\s*\([^)]*\)\s*{[^}]*(?:test|assert)"
-            ],
-            
-            # Assertion patterns for multiple languages
-            "assertion": [
-                # Common across languages
-                r"assert", r"expect\(.*\).to", r"should\.", 
-                # Java/C# patterns
-                r"assertEquals", r"assertTrue", r"assertFalse", r"verify\(", 
-                # C++ patterns
-                r"ASSERT_", r"EXPECT_", r"BOOST_(?:CHECK|REQUIRE|TEST)",
-                # Rust patterns
-                r"assert!", r"assert_eq!", r"assert_ne!",
-                # Additional patterns
-                r"is_equal", r"isEqual", r"areEqual", r"notEqual",
-                r"is\s*\(", r"\.not\.", r"be\."
-            ],
-            
-            # Edge case patterns
-            "edge_case": [
-                r"edge\s*case", r"boundary", r"empty", 
-                r"null", r"nil", r"none", r"undefined", r"Option::None",
-                r"exception", r"error", r"throw", r"unwrap", r"panic", r"fail",
-                r"overflow", r"underflow", r"zero", r"NaN", r"Infinity",
-                r"max\s*value", r"min\s*value", r"INT_MAX", r"INT_MIN", r"std::numeric_limits",
-                r"special\s*character", r"unicode", r"utf", 
-                r"(?:very|too)\s*(?:large|small|long|short)"
-            ],
-            
-            # Mocking patterns for multiple languages
-            "mocking": [
-                r"mock", r"stub", r"fake", r"spy", r"dummy", r"double",
-                r"@Mock", r"createMock", r"MockBean", r"mockito", 
-                r"jest.fn", r"sinon", r"moq", r"gmock", r"test::mock",
-                r"setUp\([^)]*mock", r"setup\([^)]*mock",
-                r"patch", r"MagicMock"
-            ],
-            
-            # Test fixures/setup
-            "fixtures": [
-                r"(?:before|after)(?:Each|All)", r"setUp", r"tearDown", 
-                r"@Before", r"@After", r"@BeforeClass", r"@AfterClass",
-                r"TestFixture", r"fixture", r"FIXTURE", 
-                r"describe\([^)]*,\s*function", r"xdescribe", r"fdescribe"
-            ],
-            
-            # Performance testing
-            "performance": [
-                r"benchmark", r"perf", r"performance", r"timing", r"elapsed",
-                r"Duration", r"Stopwatch", r"time\.time", r"System\.nanoTime",
-                r"Date\.now", r"performance\.now", r"hrtime", r"clock\(\)",
-                r"CLOCK_", r"std::chrono", r"boost::timer"
-            ],
-            
-            # Security testing
-            "security": [
-                r"security", r"vulnerability", r"exploit", r"attack", r"injection",
-                r"sanitize", r"escape", r"XSS", r"CSRF", r"overflow", r"underflow",
-                r"authenticate", r"authorize", r"permission", r"privilege"
-            ]
-        }
-        
-        # Language-specific features (to detect language and accommodate)
-        self.language_features = {
-            "python": [r"def\s+\w+", r"import\s+", r"from\s+\w+\s+import", r":\s*$", r"pytest", r"unittest"],
-            "javascript": [r"function\s+", r"const\s+", r"let\s+", r"var\s+", r"=>\s*{", r"jest", r"mocha"],
-            "typescript": [r"interface\s+", r"class\s+", r"type\s+", r":\s*\w+", r"<\w+>"],
-            "java": [r"public\s+class", r"private\s+\w+", r"protected\s+\w+", r"@Test", r"JUnit", r"TestNG"],
-            "cpp": [r"#include", r"::\s*\w+", r"std::", r"template\s*<", r"namespace", r"gtest", r"expected<", r"std::format", r"std::print", r"auto\s*\(\s*\w+\s*\)", r"if\s+consteval"],
-            "csharp": [r"namespace\s+", r"using\s+\w+;", r"public\s+(?:class|void)", r"NUnit", r"xUnit"],
-            "rust": [r"fn\s+\w+", r"let\s+mut", r"impl\s+", r"pub\s+", r"struct\s+", r"enum\s+", r"mod\s+", r"#\[test\]"],
-            "bash": [r"\[\[", r"\$\(", r"\$\{", r"function\s+\w+\s*\(\)", r"echo", r"#!/"],
-            "go": [r"func\s+\w+", r"package\s+\w+", r"import\s+\(", r"func Test\w+\(t \*testing.T\)"],
-            "ruby": [r"def\s+\w+", r"describe\s+", r"it\s+", r"require\s+", r"rspec", r"test_"]
-        }
+        # The pattern tables are built once at import and shared by all instances
+        self.test_type_patterns = _TEST_TYPE_PATTERNS
+        self.language_features = _LANGUAGE_FEATURES
         
     def evaluate_test_quality(self, test_code: str, task_description: str = None,
-                             source_code: str = None, language: str = None) -> Dict[str, Any]:
+                             source_code: str = None, language: str = None,
+                             metrics: Optional[Iterable[str]] = None) -> Dict[str, Any]:
         """
         Evaluate the quality of test code using various metrics.
         
@@ -139,6 +441,8 @@ class TestQualityMetrics:
             task_description: Optional task description for relevance assessment
             source_code: Optional source code being tested
             language: Optional programming language for language-specific analysis
+            metrics: Optional result keys to compute; only the sub-metrics they
+                depend on are run. Defaults to every key
             
         Returns:
             Dictionary containing quality metrics including:
@@ -151,9 +455,18 @@ class TestQualityMetrics:
             - strengths: List of identified test strengths
             - weaknesses: List of identified test weaknesses
         """
+        if metrics is None:
+            requested = _RESULT_DEPENDENCIES.keys()
+        else:
+            requested = set(metrics)
+            unknown = requested - _RESULT_DEPENDENCIES.keys()
+            if unknown:
+                raise ValueError(f"Unknown test quality metrics: {', '.join(sorted(unknown))}")
+        needed = frozenset().union(*(_RESULT_DEPENDENCIES[key] for key in requested))
+        
         if not test_code or len(test_code.strip()) < 10:
             logger.warning("Empty or minimal test code provided for quality evaluation")
-            return {
+            result = {
                 "completeness_score": 0.0,
                 "variety_score": 0.0,
                 "edge_case_score": 0.0,
@@ -163,85 +476,137 @@ class TestQualityMetrics:
                 "strengths": [],
                 "weaknesses": ["Tests appear to be empty or minimal"]
             }
+            if metrics is not None:
+                result = {key: value for key, value in result.items() if key in requested}
+            return result
         
         # Auto-detect language if not provided
         if not language:
             language = self._detect_language(test_code)
             logger.debug(f"Detected language as: {language}")
             
-        # Calculate individual metrics
-        completeness = self._calculate_completeness(test_code, source_code, language)
-        variety = self._calculate_test_variety(test_code, language)
-        edge_case_coverage = self._calculate_edge_case_coverage(test_code, task_description, language)
-        assertion_density = self._calculate_assertion_density(test_code, language)
-        readability = self._calculate_readability(test_code, language)
-        test_isolation = self._calculate_test_isolation(test_code, language)
-        task_alignment = self._calculate_task_alignment(test_code, task_description) if task_description else {"score": 0.7}
-        
-        # Determine overall quality with the enhanced metrics
-        overall_quality = self._calculate_overall_quality([
-            completeness["score"], 
-            variety["score"], 
-            edge_case_coverage["score"],
-            assertion_density["normalized_score"],
-            readability["score"],
-            test_isolation["score"],
-            task_alignment["score"]
-        ])
-        
-        # Identify strengths and weaknesses
-        strengths = []
-        weaknesses = []
-        
-        # Add specific strengths
-        if completeness["score"] > 0.7:
-            strengths.append("Good test coverage")
-        if variety["score"] > 0.7:
-            strengths.append("Good variety of test approaches")
-        if edge_case_coverage["score"] > 0.7:
-            strengths.append("Good edge case handling")
-        if assertion_density["normalized_score"] > 0.7:
-            strengths.append("Strong assertion density")
-        if readability["score"] > 0.7:
-            strengths.append("High test readability")
-        if test_isolation["score"] > 0.7:
-            strengths.append("Well-isolated tests")
-        if task_alignment["score"] > 0.7:
-            strengths.append("Tests well-aligned with task requirements")
-            
-        # Add specific weaknesses
-        if completeness["score"] < 0.4:
-            weaknesses.append("Limited test coverage")
-        if variety["score"] < 0.4:
-            weaknesses.append("Limited variety of test approaches")
-        if edge_case_coverage["score"] < 0.4:
-            weaknesses.append("Insufficient edge case handling")
-        if assertion_density["normalized_score"] < 0.4:
-            weaknesses.append("Low assertion density")
-        if readability["score"] < 0.4:
-            weaknesses.append("Poor test readability")
-        if test_isolation["score"] < 0.4:
-            weaknesses.append("Tests lack proper isolation")
-        if task_alignment["score"] < 0.4:
-            weaknesses.append("Tests don't align well with task requirements")
-            
-        # Combine metrics
-        return {
-            "completeness_score": completeness["score"],
-            "variety_score": variety["score"],
-            "edge_case_score": edge_case_coverage["score"],
-            "assertion_density": assertion_density["value"],
-            "normalized_assertion_density": assertion_density["normalized_score"],
-            "readability_score": readability["score"],
-            "test_isolation_score": test_isolation["score"],
-            "task_alignment_score": task_alignment["score"],
-            "overall_quality": overall_quality,
-            "detected_language": language,
-            "strengths": strengths,
-            "weaknesses": weaknesses,
-            "test_count": completeness["test_count"],
-            "assertion_count": assertion_density["assertion_count"]
-        }
+        # Case-insensitive checks run case-sensitive patterns against one
+        # lowercased copy; re.IGNORECASE would disable re's literal prefix search
+        lower_code = test_code.lower()
+        # Completeness and assertion density both need the unit test count
+        test_count = self._count_unit_tests(test_code) if needed & {"completeness", "assertion_density"} else None
+        
+        # Calculate the individual metrics that are needed
+        result = {}
+        
+        if "completeness" in needed:
+            completeness = self._calculate_completeness(test_code, source_code, language, lower_code, test_count)
+            result["completeness_score"] = completeness["score"]
+        if "variety" in needed:
+            variety = self._calculate_test_variety(test_code, language)
+            result["variety_score"] = variety["score"]
+        if "edge_case" in needed:
+            edge_case_coverage = self._calculate_edge_case_coverage(test_code, task_description, language, lower_code)
+            result["edge_case_score"] = edge_case_coverage["score"]
+        if "assertion_density" in needed:
+            assertion_density = self._calculate_assertion_density(test_code, language, lower_code, test_count)
+            result["assertion_density"] = assertion_density["value"]
+            result["normalized_assertion_density"] = assertion_density["normalized_score"]
+        if "readability" in needed:
+            readability = self._calculate_readability(test_code, language)
+            result["readability_score"] = readability["score"]
+        if "test_isolation" in needed:
+            test_isolation = self._calculate_test_isolation(test_code, language, lower_code)
+            result["test_isolation_score"] = test_isolation["score"]
+        if "task_alignment" in needed:
+            task_alignment = self._calculate_task_alignment(test_code, task_description, lower_code) if task_description else {"score": 0.7}
+            result["task_alignment_score"] = task_alignment["score"]
+        
+        # Overall quality, strengths and weaknesses combine every metric
+        if needed == _SUB_METRICS:
+            # Determine overall quality with the enhanced metrics
+            result["overall_quality"] = self._calculate_overall_quality([
+                completeness["score"], 
+                variety["score"], 
+                edge_case_coverage["score"],
+                assertion_density["normalized_score"],
+                readability["score"],
+                test_isolation["score"],
+                task_alignment["score"]
+            ])
+        
+        result["detected_language"] = language
+        
+        if needed == _SUB_METRICS:
+            # Identify strengths and weaknesses
+            strengths = []
+            weaknesses = []
+            
+            # Add specific strengths
+            if completeness["score"] > 0.7:
+                strengths.append("Good test coverage")
+            if variety["score"] > 0.7:
+                strengths.append("Good variety of test approaches")
+            if edge_case_coverage["score"] > 0.7:
+                strengths.append("Good edge case handling")
+            if assertion_density["normalized_score"] > 0.7:
+                strengths.append("Strong assertion density")
+            if readability["score"] > 0.7:
+                strengths.append("High test readability")
+            if test_isolation["score"] > 0.7:
+                strengths.append("Well-isolated tests")
+            if task_alignment["score"] > 0.7:
+                strengths.append("Tests well-aligned with task requirements")
+                
+            # Add specific weaknesses
+            if completeness["score"] < 0.4:
+                weaknesses.append("Limited test coverage")
+            if variety["score"] < 0.4:
+                weaknesses.append("Limited variety of test approaches")
+            if edge_case_coverage["score"] < 0.4:
+                weaknesses.append("Insufficient edge case handling")
+            if assertion_density["normalized_score"] < 0.4:
+                weaknesses.append("Low assertion density")
+            if readability["score"] < 0.4:
+                weaknesses.append("Poor test readability")
+            if test_isolation["score"] < 0.4:
+                weaknesses.append("Tests lack proper isolation")
+            if task_alignment["score"] < 0.4:
+                weaknesses.append("Tests don't align well with task requirements")
+            
+            result["strengths"] = strengths
+            result["weaknesses"] = weaknesses
+        
+        if "completeness" in needed:
+            result["test_count"] = completeness["test_count"]
+        if "assertion_density" in needed:
+            result["assertion_count"] = assertion_density["assertion_count"]
+        
+        if metrics is not None:
+            result = {key: value for key, value in result.items() if key in requested}
+        return result
+    
+    def evaluate_many(self, test_codes: Iterable[str], task_description: str = None,
+                      source_code: str = None, language: str = None,
+                      metrics: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Evaluate the quality of several test code snippets against the same task.
+        
+        The snippets are evaluated one after another with this evaluator's
+        compiled patterns. A thread pool wouldn't help, since re holds the GIL
+        while it matches.
+        
+        Args:
+            test_codes: The test code snippets to evaluate
+            task_description: Optional task description for relevance assessment
+            source_code: Optional source code being tested
+            language: Optional programming language; detected per snippet if omitted
+            metrics: Optional result keys to compute; defaults to every key
+            
+        Returns:
+            One evaluate_test_quality result per snippet, in order
+        """
+        if metrics is not None:
+            metrics = frozenset(metrics)
+        return [
+            self.evaluate_test_quality(test_code, task_description, source_code, language, metrics)
+            for test_code in test_codes
+        ]
     
     def _detect_language(self, code: str) -> str:
         """
@@ -256,12 +621,15 @@ class TestQualityMetrics:
         if not code:
             return "unknown"
             
-        # Count matches for each language's features
+        # Count matches for each language's features. Each pattern scans on its
+        # own: re finds a pattern's literal prefix quickly, while one fused
+        # alternation of all the features runs many times slower and can't
+        # credit two languages for overlapping matches.
         language_scores = {}
-        for lang, patterns in self.language_features.items():
+        for lang, patterns in _LANGUAGE_FEATURES_RE.items():
             score = 0
             for pattern in patterns:
-                matches = re.findall(pattern, code)
+                matches = pattern.findall(code)
                 score += len(matches)
             language_scores[lang] = score
             
@@ -273,8 +641,24 @@ class TestQualityMetrics:
                 
         return "unknown"
         
+    def _count_unit_tests(self, test_code: str) -> int:
+        """
+        Count test functions/methods by summing the matches of every unit test pattern.
+        
+        Args:
+            test_code: The test code
+            
+        Returns:
+            The number of unit test pattern matches
+        """
+        test_count = 0
+        for pattern in _TEST_TYPE_RE["unit"]:
+            test_count += len(pattern.findall(test_code))
+        return test_count
+        
     def _calculate_completeness(self, test_code: str, source_code: str = None, 
-                               language: str = "unknown") -> Dict[str, Any]:
+                               language: str = "unknown", lower_code: str = None,
+                               test_count: int = None) -> Dict[str, Any]:
         """
         Calculate how complete the tests appear to be.
         
@@ -282,45 +666,24 @@ class TestQualityMetrics:
             test_code: The test code
             source_code: Optional source code being tested
             language: Programming language for language-specific analysis
+            lower_code: Optional lowercased test code, if already computed
+            test_count: Optional unit test count, if already computed
             
         Returns:
             Dictionary with completeness score and related metrics
         """
         # Count test functions/methods
-        test_count = 0
-        for pattern in self.test_type_patterns["unit"]:
-            test_count += len(re.findall(pattern, test_code))
+        if test_count is None:
+            test_count = self._count_unit_tests(test_code)
             
         # If we have source code, try to estimate coverage
         coverage_ratio = None
         if source_code:
             # Extract function/method names from source code
-            source_funcs = set()
-            # Common patterns for function definitions across languages
-            func_patterns = [
-                r"def\s+(\w+)\s*\(", 
-                r"function\s+(\w+)\s*\(",
-                r"(?:public|private|protected)\s+\w+\s+(\w+)\s*\(",
-                r"\w+\s+(\w+)\s*\([^)]*\)\s*\{",
-                r"fn\s+(\w+)\s*\(",  # Rust
-                r"func\s+(\w+)\s*\("  # Go
-            ]
-            for pattern in func_patterns:
-                for match in re.finditer(pattern, source_code):
-                    source_funcs.add(match.group(1))
+            source_funcs = set().union(*(pattern.findall(source_code) for pattern in _SOURCE_FUNC_PATTERNS))
             
             # Extract function/method names being tested
-            tested_funcs = set()
-            # Patterns that indicate a function is being tested
-            test_func_patterns = [
-                r"test\w*_(\w+)", 
-                r"test\s+that\s+(\w+)",
-                r"(\w+)\s*\([^)]*\)\s*(?:should|must|will)",
-                r"(?:assert|expect)[^;]*(?:\.|\s+)(\w+)\s*\("
-            ]
-            for pattern in test_func_patterns:
-                for match in re.finditer(pattern, test_code):
-                    tested_funcs.add(match.group(1))
+            tested_funcs = set().union(*(pattern.findall(test_code) for pattern in _TESTED_FUNC_PATTERNS))
             
             # Calculate coverage if we found functions
             if source_funcs:
@@ -328,15 +691,17 @@ class TestQualityMetrics:
                 
                 # Look for additional coverage indicators
                 coverage_indicators = {}
+                if lower_code is None:
+                    lower_code = test_code.lower()
                 
                 # Look for branch coverage indicators
-                coverage_indicators["branches"] = re.search(r"branch\s+coverage", test_code.lower()) is not None
+                coverage_indicators["branches"] = _BRANCH_COVERAGE_RE.search(lower_code) is not None
                 
                 # Look for statement coverage indicators
-                coverage_indicators["statements"] = re.search(r"statement\s+coverage", test_code.lower()) is not None
+                coverage_indicators["statements"] = _STATEMENT_COVERAGE_RE.search(lower_code) is not None
                 
                 # Look for path coverage indicators
-                coverage_indicators["paths"] = re.search(r"path\s+coverage", test_code.lower()) is not None
+                coverage_indicators["paths"] = _PATH_COVERAGE_RE.search(lower_code) is not None
         
         # Calculate final score based on available metrics
         if coverage_ratio is not None:
@@ -344,7 +709,7 @@ class TestQualityMetrics:
             score = coverage_ratio
         else:
             # Otherwise base score on test count with diminishing returns
-            score = min(1.0, math.sqrt(test_count / 10))
+            score = _COMPLETENESS_BY_TEST_COUNT[min(test_count, 10)]
         
         return {
             "score": score,
@@ -364,47 +729,27 @@ class TestQualityMetrics:
             Dictionary with variety score and related metrics
         """
         approaches_used = {}
+        categories_present = self._find_present_categories(test_code)
         
         # Check for different testing approaches
-        approaches_used["parameterized"] = any(
-            re.search(pattern, test_code)
-            for pattern in self.test_type_patterns["parameterized"]
-        )
+        approaches_used["parameterized"] = "parameterized" in categories_present
         
-        approaches_used["mocking"] = any(
-            re.search(pattern, test_code)
-            for pattern in self.test_type_patterns["mocking"]
-        )
+        approaches_used["mocking"] = "mocking" in categories_present
         
         # Check for setup/teardown
-        approaches_used["setup_teardown"] = any(
-            re.search(pattern, test_code)
-            for pattern in self.test_type_patterns["fixtures"]
-        )
+        approaches_used["setup_teardown"] = "fixtures" in categories_present
         
         # Check for test grouping
-        approaches_used["test_grouping"] = re.search(
-            r"(?:describe\s*\(|suite\s*\(|class\s+\w+Test|@Nested|context\s*\(|xdescribe|fdescribe)",
-            test_code
-        ) is not None
+        approaches_used["test_grouping"] = _TEST_GROUPING_RE.search(test_code) is not None
         
         # Check for data-driven tests
-        approaches_used["data_driven"] = re.search(
-            r"(?:test.each|@TestFactory|@DataProvider|testdata|@UseDataProvider|@CsvSource|@ValueSource)",
-            test_code
-        ) is not None
+        approaches_used["data_driven"] = _DATA_DRIVEN_RE.search(test_code) is not None
         
         # Check for performance testing
-        approaches_used["performance"] = any(
-            re.search(pattern, test_code)
-            for pattern in self.test_type_patterns["performance"]
-        )
+        approaches_used["performance"] = "performance" in categories_present
         
         # Check for security testing
-        approaches_used["security"] = any(
-            re.search(pattern, test_code)
-            for pattern in self.test_type_patterns["security"]
-        )
+        approaches_used["security"] = "security" in categories_present
         
         # Count the number of approaches used
         approaches_count = sum(1 for used in approaches_used.values() if used)
@@ -422,9 +767,39 @@ class TestQualityMetrics:
             "approaches_count": approaches_count
         }
         
+    def _find_present_categories(self, test_code: str) -> Set[str]:
+        """
+        Find which of the presence-only test type categories occur in the code.
+        
+        Args:
+            test_code: The test code
+            
+        Returns:
+            Set of the categories from _PRESENCE_CATEGORIES that were found
+        """
+        if _PRESENCE_AUTOMATON is None:
+            return {
+                category for category in _PRESENCE_CATEGORIES
+                if _FUSED_TEST_TYPES[category].search(test_code) is not None
+            }
+        
+        found = set()
+        for _, categories in _PRESENCE_AUTOMATON.iter(test_code):
+            found.update(categories)
+            if len(found) == len(_PRESENCE_CATEGORIES):
+                return found
+        
+        # Fall back to the regex patterns for categories with no literal match
+        for category in _PRESENCE_CATEGORIES:
+            residual = _PRESENCE_RESIDUAL_FUSED[category]
+            if category not in found and residual is not None and residual.search(test_code):
+                found.add(category)
+        return found
+        
     def _calculate_edge_case_coverage(self, test_code: str, 
                                      task_description: str = None,
-                                     language: str = "unknown") -> Dict[str, Any]:
+                                     language: str = "unknown",
+                                     lower_code: str = None) -> Dict[str, Any]:
         """
         Calculate how well edge cases are covered in the tests.
         
@@ -432,35 +807,45 @@ class TestQualityMetrics:
             test_code: The test code
             task_description: Optional task description for relevance assessment
             language: Programming language for language-specific analysis
+            lower_code: Optional lowercased test code, if already computed
             
         Returns:
             Dictionary with edge case score and related metrics
         """
-        # Look for edge case testing patterns
-        edge_case_matches = []
-        for pattern in self.test_type_patterns["edge_case"]:
-            edge_case_matches.extend(re.finditer(pattern, test_code, re.IGNORECASE))
+        if lower_code is None:
+            lower_code = test_code.lower()
         
         # Count unique edge case tests (deduplicate by line number)
-        seen_lines = set()
         unique_edge_case_count = 0
-        for match in edge_case_matches:
-            # Estimate line number based on newlines before the match
-            line_num = test_code[:match.start()].count('\n')
-            if line_num not in seen_lines:
-                seen_lines.add(line_num)
+        line_num = 0
+        line_pos = 0
+        counted_line = -1
+        for match in _EDGE_CASE_STARTS_RE.finditer(lower_code):
+            # Matches arrive in order, so only count newlines since the last one
+            # and a line is new exactly when it differs from the last counted one
+            line_num += lower_code.count('\n', line_pos, match.start())
+            line_pos = match.start()
+            if line_num != counted_line:
+                counted_line = line_num
                 unique_edge_case_count += 1
         
         # Look for specific types of edge cases
-        edge_case_types = {
-            "null_empty": re.search(r"(?:null|none|empty|undefined|''|\"\"|\[\]|{})", test_code.lower()) is not None,
-            "boundary": re.search(r"(?:boundary|limit|min|max|zero|negative|upper|lower)", test_code.lower()) is not None,
-            "error": re.search(r"(?:exception|error|throw|invalid|fail|panic|crash)", test_code.lower()) is not None,
-            "large_inputs": re.search(r"(?:large|big|huge|overflow|many|multiple|long)", test_code.lower()) is not None,
-            "special_chars": re.search(r"(?:special|character|symbol|unicode|utf|escape|non-ascii)", test_code.lower()) is not None,
-            "performance": re.search(r"(?:timeout|slow|fast|performance|benchmark)", test_code.lower()) is not None,
-            "concurrency": re.search(r"(?:concurrent|parallel|race|deadlock|thread|async|await)", test_code.lower()) is not None
-        }
+        if _EDGE_CASE_AUTOMATON is not None:
+            # One automaton pass finds every keyword of every category
+            edge_case_types = dict.fromkeys(_EDGE_CASE_KEYWORDS, False)
+            types_found = 0
+            for _, categories in _EDGE_CASE_AUTOMATON.iter(lower_code):
+                for edge_case_type in categories:
+                    if not edge_case_types[edge_case_type]:
+                        edge_case_types[edge_case_type] = True
+                        types_found += 1
+                if types_found == len(edge_case_types):
+                    break
+        else:
+            edge_case_types = {
+                edge_case_type: pattern.search(lower_code) is not None
+                for edge_case_type, pattern in _EDGE_CASE_TYPE_PATTERNS.items()
+            }
         
         # Count types of edge cases covered
         types_covered = sum(1 for covered in edge_case_types.values() if covered)
@@ -475,8 +860,7 @@ class TestQualityMetrics:
         # Additional language-specific checks
         if language == "cpp" or language == "rust":
             # Memory safety edge cases are important for these languages
-            has_memory_safety = re.search(r"(?:memory|leak|dangling|null|overflow|underflow|bound|out of bounds|buffer)", 
-                                         test_code.lower()) is not None
+            has_memory_safety = _MEMORY_SAFETY_RE.search(lower_code) is not None
             if has_memory_safety:
                 score = min(1.0, score + 0.1)
         
@@ -487,61 +871,52 @@ class TestQualityMetrics:
             "types_covered": types_covered
         }
         
-    def _calculate_assertion_density(self, test_code: str, language: str = "unknown") -> Dict[str, Any]:
+    def _calculate_assertion_density(self, test_code: str, language: str = "unknown",
+                                    lower_code: str = None, test_count: int = None) -> Dict[str, Any]:
         """
         Calculate the density of assertions per test case.
         
         Args:
             test_code: The test code
             language: Programming language for language-specific analysis
+            lower_code: Optional lowercased test code, if already computed
+            test_count: Optional unit test count, if already computed
             
         Returns:
             Dictionary with assertion density and related metrics
         """
         # Count test functions
-        test_count = 0
-        for pattern in self.test_type_patterns["unit"]:
-            test_count += len(re.findall(pattern, test_code))
+        if test_count is None:
+            test_count = self._count_unit_tests(test_code)
         
         test_count = max(1, test_count)  # Avoid division by zero
         
         # Count assertions
         assertion_count = 0
-        for pattern in self.test_type_patterns["assertion"]:
-            assertion_count += len(re.findall(pattern, test_code))
+        for pattern in _TEST_TYPE_RE["assertion"]:
+            assertion_count += len(pattern.findall(test_code))
             
         # Calculate density
         assertion_density = assertion_count / test_count
         
         # Analyze assertion diversity
         assertion_types = set()
+        if lower_code is None:
+            lower_code = test_code.lower()
         
-        # Common assertion type patterns across languages
-        assertion_type_patterns = {
-            "equality": r"(?:equal|same|identical|matches|is)\b",
-            "inequality": r"(?:not\s+equal|different|not\s+same|inequality|isNot)\b",
-            "boolean": r"(?:true|false|assertTrue|assertFalse|isTrue|isFalse)\b",
-            "null_check": r"(?:null|none|nil|undefined|assertNull|assertNotNull|isNull|isNotNull)\b",
-            "exception": r"(?:throws|exception|assertThrows|expect\w*\s*\w+\s*to\s*throw|catch|try)\b",
-            "type_check": r"(?:instanceof|typeof|is_a|isinstance|isInstanceOf|assertInstanceOf)\b",
-            "collection": r"(?:contains|size|length|empty|has|elements|in)\b",
-        }
-        
-        for assertion_type, pattern in assertion_type_patterns.items():
-            if re.search(pattern, test_code, re.IGNORECASE):
+        for assertion_type, pattern in _ASSERTION_TYPE_PATTERNS.items():
+            if pattern.search(lower_code):
                 assertion_types.add(assertion_type)
         
-        assertion_diversity = len(assertion_types) / len(assertion_type_patterns)
+        assertion_diversity = len(assertion_types) / len(_ASSERTION_TYPE_PATTERNS)
         
-        # Normalize score (optimal density is around 3-5 assertions per test)
-        if assertion_density <= 0:
-            normalized_score = 0.0
-        elif assertion_density < 1:
-            normalized_score = assertion_density * 0.5  # Less than 1 assertion per test is suboptimal
-        elif assertion_density <= 5:
-            normalized_score = 0.5 + (assertion_density / 10)  # Linear increase up to 5
+        # Normalize score (optimal density is around 3-5 assertions per test).
+        # Less than 1 assertion per test is suboptimal (and 0 scores 0.0); from
+        # there it increases linearly, and 5+ is excellent
+        if assertion_density < 1:
+            normalized_score = assertion_density * 0.5
         else:
-            normalized_score = 1.0  # 5+ is excellent
+            normalized_score = min(1.0, 0.5 + (assertion_density / 10))
             
         # Adjust score based on assertion diversity
         normalized_score = min(1.0, normalized_score + (assertion_diversity * 0.2))
@@ -575,55 +950,32 @@ class TestQualityMetrics:
         # Calculate metrics
         metrics = {}
         
-        # Check for comments
+        # Check for comments and indentation in a single pass over the lines.
+        # This beats a re.MULTILINE findall, which tries "^" at every character
         comment_lines = 0
-        comment_patterns = {
-            "python": [r"^\s*#", r"^\s*\"\"\""],
-            "javascript": [r"^\s*//", r"^\s*/\*"],
-            "typescript": [r"^\s*//", r"^\s*/\*"],
-            "java": [r"^\s*//", r"^\s*/\*"],
-            "cpp": [r"^\s*//", r"^\s*/\*"],
-            "csharp": [r"^\s*//", r"^\s*/\*"],
-            "rust": [r"^\s*//", r"^\s*/\*"],
-            "go": [r"^\s*//", r"^\s*/\*"],
-            "unknown": [r"^\s*#", r"^\s*//", r"^\s*/\*", r"^\s*\"\"\""]
-        }
+        indent_sizes = []
         
-        # Use language-specific comment patterns if available
-        patterns = comment_patterns.get(language, comment_patterns["unknown"])
+        # Use language-specific comment markers if available
+        comment_prefixes = _COMMENT_PREFIXES.get(language, _COMMENT_PREFIXES["unknown"])
         
         for line in lines:
-            stripped = line.strip()
-            is_comment = False
-            for pattern in patterns:
-                if re.match(pattern, stripped):
-                    is_comment = True
-                    break
-            if is_comment:
+            stripped = line.lstrip()
+            if not stripped:
+                continue
+            indent_sizes.append(len(line) - len(stripped))
+            if stripped.startswith(comment_prefixes):
                 comment_lines += 1
         
         metrics["comment_ratio"] = comment_lines / total_lines
         
         # Check for descriptive test names based on language
-        test_name_patterns = {
-            "python": r"def\s+test_(\w+)",
-            "javascript": r"(?:test|it)\s*\(\s*['\"]([^'\"]+)",
-            "typescript": r"(?:test|it)\s*\(\s*['\"]([^'\"]+)",
-            "java": r"(?:public|private|protected)\s+void\s+test(\w+)",
-            "cpp": r"TEST\s*\([^,]*,\s*(\w+)",
-            "csharp": r"public\s+void\s+Test(\w+)",
-            "rust": r"fn\s+test_(\w+)",
-            "unknown": r"(?:test|Test)_?(\w+)"
-        }
-        
-        # Use appropriate pattern
-        pattern = test_name_patterns.get(language, test_name_patterns["unknown"])
-        test_names = re.findall(pattern, test_code)
+        pattern = _TEST_NAME_PATTERNS.get(language, _TEST_NAME_PATTERNS["unknown"])
+        test_names = pattern.findall(test_code)
         
         # Check for descriptive names (longer than 8 chars, and containing underscore or multiple words)
         descriptive_names_count = 0
         for name in test_names:
-            if len(name) >= 8 or '_' in name or re.search(r'[A-Z][a-z]', name):
+            if len(name) >= 8 or '_' in name or _CAMEL_CASE_WORD_RE.search(name):
                 descriptive_names_count += 1
         
         if test_names:
@@ -632,37 +984,19 @@ class TestQualityMetrics:
             metrics["descriptive_names"] = 0.0
             
         # Check for test organization
-        test_org_patterns = {
-            "python": r"class\s+\w+Test",
-            "javascript": r"describe\s*\(",
-            "typescript": r"describe\s*\(",
-            "java": r"(?:public|private)\s+class\s+\w+Test",
-            "cpp": r"TEST_F\s*\(",
-            "csharp": r"public\s+class\s+\w+Test",
-            "rust": r"mod\s+tests",
-            "unknown": r"(?:class|describe|module)\s+\w+"
-        }
-        
-        # Use appropriate pattern
-        pattern = test_org_patterns.get(language, test_org_patterns["unknown"])
-        metrics["organized"] = re.search(pattern, test_code) is not None
+        pattern = _TEST_ORG_PATTERNS.get(language, _TEST_ORG_PATTERNS["unknown"])
+        metrics["organized"] = pattern.search(test_code) is not None
         
         # Check average line length (too long is hard to read)
-        avg_line_length = sum(len(line) for line in lines) / total_lines
+        avg_line_length = sum(map(len, lines)) / total_lines
         metrics["avg_line_length"] = avg_line_length
         line_length_score = max(0.0, min(1.0, 2.0 - (avg_line_length / 80)))
         
-        # Check for consistent indentation
-        indent_sizes = []
-        for line in lines:
-            if line.strip() and not line.isspace():
-                leading_spaces = len(line) - len(line.lstrip())
-                indent_sizes.append(leading_spaces)
-        
-        if indent_sizes:
+        # Check for consistent indentation; top-level lines fit any indent size
+        nested_indent_sizes = [size for size in indent_sizes if size]
+        if nested_indent_sizes:
             # Calculate the mode (most common indent size)
-            from collections import Counter
-            indent_counter = Counter(indent_sizes)
+            indent_counter = Counter(nested_indent_sizes)
             mode_indent = indent_counter.most_common(1)[0][0]
             
             # Calculate the percentage of lines with consistent indentation
@@ -687,16 +1021,19 @@ class TestQualityMetrics:
             "metrics": metrics
         }
         
-    def _calculate_test_isolation(self, test_code: str, language: str = "unknown") -> Dict[str, Any]:
+    def _calculate_test_isolation(self, test_code: str, language: str = "unknown",
+                                 lower_code: str = None) -> Dict[str, Any]:
         """
         Calculate how well tests are isolated from each other.
         
         Args:
             test_code: The test code
             language: Programming language
+            lower_code: Optional lowercased test code, if already computed
             
         Returns:
-            Dictionary with test isolation score and related metrics
+            Dictionary with test isolation score and related metrics. The
+            global_variables metric is None when it could not change the score
         """
         # Initialize metrics
         metrics = {
@@ -707,61 +1044,32 @@ class TestQualityMetrics:
             "individual_test_fixtures": False
         }
         
-        # Check for setup/teardown patterns
-        setup_teardown_patterns = {
-            "python": [r"def\s+setUp", r"def\s+tearDown", r"@pytest.fixture"],
-            "javascript": [r"beforeEach", r"afterEach", r"beforeAll", r"afterAll"],
-            "typescript": [r"beforeEach", r"afterEach", r"beforeAll", r"afterAll"],
-            "java": [r"@Before", r"@After", r"@BeforeClass", r"@AfterClass"],
-            "cpp": [r"SetUp\(\)", r"TearDown\(\)", r"TEST_F"],
-            "csharp": [r"\[SetUp\]", r"\[TearDown\]"],
-            "rust": [r"#\[fixture\]", r"mod\s+tests\s*\{"],
-            "unknown": [r"(?:setup|teardown|before|after)"]
-        }
+        if lower_code is None:
+            lower_code = test_code.lower()
         
-        # Use appropriate patterns
-        patterns = setup_teardown_patterns.get(language, setup_teardown_patterns["unknown"])
-        metrics["has_setup_teardown"] = any(re.search(pattern, test_code, re.IGNORECASE) for pattern in patterns)
-        
-        # Check for reset patterns
-        reset_patterns = [r"(?:reset|clear|clean|new)", r"mock\w*\.reset", r"restore"]
-        metrics["has_reset_between_tests"] = any(re.search(pattern, test_code, re.IGNORECASE) for pattern in reset_patterns)
+        # Each check below is its own search that stops at the first hit. One
+        # named-group finditer sweep over all of them is about 10x slower, as it
+        # walks the whole alternation at every position of the code
         
-        # Check for shared state indicators
-        shared_state_patterns = [
-            r"static\s+\w+\s*=", 
-            r"let\s+\w+\s*=.+;\s*(?:\n[^\n]*){2,}\s*\w+\s*=", 
-            r"var\s+\w+\s*=.+;\s*(?:\n[^\n]*){2,}\s*\w+\s*=",
-            r"(?:global|nonlocal)\s+\w+"
-        ]
-        metrics["shared_state_detected"] = any(re.search(pattern, test_code, re.MULTILINE) for pattern in shared_state_patterns)
-        
-        # Check for global variables
-        global_patterns = {
-            "python": [r"(?:^|\s)global\s+", r"(?:^|\s)\w+\s*=\s*(?!\s*(?:function|def|class))"],
-            "javascript": [r"(?:var|let|const)\s+\w+\s*=.+;\s*(?:\n[^\n]*\n)[^\n]*\s*\w+\s*="],
-            "typescript": [r"(?:var|let|const)\s+\w+\s*=.+;\s*(?:\n[^\n]*\n)[^\n]*\s*\w+\s*="],
-            "java": [r"(?:static|public static|private static)\s+\w+\s+\w+\s*="],
-            "cpp": [r"(?:static|extern)\s+\w+\s+\w+\s*="],
-            "unknown": [r"(?:global|static|var|let|const)\s+\w+\s*="]
-        }
+        # Check for setup/teardown patterns
+        literals, patterns = _SETUP_TEARDOWN_PATTERNS.get(language, _SETUP_TEARDOWN_PATTERNS["unknown"])
+        metrics["has_setup_teardown"] = (
+            any(literal in lower_code for literal in literals)
+            or any(pattern.search(lower_code) for pattern in patterns)
+        )
         
-        # Use appropriate patterns
-        patterns = global_patterns.get(language, global_patterns["unknown"])
-        metrics["global_variables"] = any(re.search(pattern, test_code, re.MULTILINE) for pattern in patterns)
+        # Check for reset patterns
+        metrics["has_reset_between_tests"] = (
+            any(literal in lower_code for literal in _RESET_LITERALS)
+            or any(pattern.search(lower_code) for pattern in _RESET_PATTERNS)
+        )
         
         # Check for individual test fixtures/contexts
-        fixture_patterns = {
-            "python": [r"@pytest.fixture\s*def\s+\w+"],
-            "javascript": [r"describe\([^)]+,\s*function\s*\(\)\s*{[^}]*beforeEach"],
-            "java": [r"@Rule\s+public\s+\w+"],
-            "cpp": [r"class\s+\w+\s*:\s*public\s+::testing::Test"],
-            "unknown": [r"(?:fixture|context|describe|suite)"]
-        }
+        patterns = _FIXTURE_PATTERNS.get(language, _FIXTURE_PATTERNS["unknown"])
+        metrics["individual_test_fixtures"] = any(pattern.search(lower_code) for pattern in patterns)
         
-        # Use appropriate patterns
-        patterns = fixture_patterns.get(language, fixture_patterns["unknown"])
-        metrics["individual_test_fixtures"] = any(re.search(pattern, test_code, re.IGNORECASE) for pattern in patterns)
+        # Check for shared state indicators
+        metrics["shared_state_detected"] = any(pattern.search(test_code) for pattern in _SHARED_STATE_PATTERNS)
         
         # Calculate score
         isolation_score = 0.0
@@ -777,8 +1085,16 @@ class TestQualityMetrics:
         # Bad practices decrease score
         if metrics["shared_state_detected"]:
             isolation_score -= 0.3
-        if metrics["global_variables"]:
-            isolation_score -= 0.2
+        
+        # Check for global variables, unless the score would reach 1.0 even
+        # with them; then the slowest check is skipped and left as None
+        if isolation_score - 0.2 + 0.5 >= 1.0:
+            metrics["global_variables"] = None
+        else:
+            patterns = _GLOBAL_PATTERNS.get(language, _GLOBAL_PATTERNS["unknown"])
+            metrics["global_variables"] = any(pattern.search(test_code) for pattern in patterns)
+            if metrics["global_variables"]:
+                isolation_score -= 0.2
             
         # Ensure score is in valid range
         isolation_score = min(1.0, max(0.0, isolation_score + 0.5))  # Base of 0.5
@@ -788,13 +1104,15 @@ class TestQualityMetrics:
             "metrics": metrics
         }
     
-    def _calculate_task_alignment(self, test_code: str, task_description: str) -> Dict[str, Any]:
+    def _calculate_task_alignment(self, test_code: str, task_description: str,
+                                  lower_code: str = None) -> Dict[str, Any]:
         """
         Calculate how well tests align with the task description.
         
         Args:
             test_code: The test code
             task_description: The description of the task
+            lower_code: Optional lowercased test code, if already computed
             
         Returns:
             Dictionary with task alignment score and related metrics
@@ -802,23 +1120,27 @@ class TestQualityMetrics:
         if not task_description:
             return {"score": 0.7, "metrics": {"no_task_description": True}}
             
-        # Extract key terms from task description
+        # Extract key terms from task description, without common words
         # Simple extraction - real implementation would use NLP
-        task_terms = set(re.findall(r'\b\w{3,}\b', task_description.lower()))
-        
-        # Remove common words
-        common_words = {
-            'the', 'and', 'for', 'with', 'that', 'this', 
-            'implement', 'create', 'function', 'code', 'test',
-            'should', 'would', 'could', 'must', 'may', 'might'
+        task_terms = {
+            term for term in _TASK_TERM_RE.findall(task_description.lower())
+            if term not in _COMMON_TASK_WORDS
         }
-        task_terms = {term for term in task_terms if term not in common_words}
         
-        # Calculate how many terms from the task appear in the tests
-        matched_terms = 0
-        for term in task_terms:
-            if re.search(rf'\b{re.escape(term)}\b', test_code, re.IGNORECASE):
-                matched_terms += 1
+        if lower_code is None:
+            lower_code = test_code.lower()
+        
+        # Calculate how many terms from the task appear in the tests, in one
+        # scan for all of them. Terms are whole words, so every match is
+        # exactly one term
+        found_terms = set()
+        if task_terms:
+            term_pattern = re.compile(r'\b(?:' + '|'.join(map(re.escape, task_terms)) + r')\b')
+            for match in term_pattern.finditer(lower_code):
+                found_terms.add(match.group())
+                if len(found_terms) == len(task_terms):
+                    break
+        matched_terms = len(found_terms)
                 
         # Calculate alignment score
         if not task_terms:
@@ -827,8 +1149,7 @@ class TestQualityMetrics:
             alignment_score = min(1.0, matched_terms / len(task_terms) + 0.2)  # Add small bonus
             
         # Check for explicit task requirement testing
-        req_indicators = ["requirement", "requirement_", "req_", "task_", "story_", "user_story"]
-        has_req_indicators = any(re.search(rf'\b{re.escape(ind)}', test_code, re.IGNORECASE) for ind in req_indicators)
+        has_req_indicators = _REQ_INDICATOR_RE.search(lower_code) is not None
         
         if has_req_indicators:
             alignment_score = min(1.0, alignment_score + 0.1)
@@ -855,9 +1176,7 @@ class TestQualityMetrics:
         if not scores:
             return 0.0
         
-        # Different weights for different metrics based on importance
-        # Weights for: completeness, variety, edge_cases, assertions, readability, isolation, task_alignment
-        weights = [0.20, 0.15, 0.20, 0.15, 0.10, 0.10, 0.10]
+        weights = _OVERALL_QUALITY_WEIGHTS
         
         # Ensure we have the right number of weights
         if len(weights) != len(scores):
@@ -868,8 +1187,26 @@ class TestQualityMetrics:
         
         return min(1.0, max(0.0, overall))
 
+@lru_cache(maxsize=1)
+def _shared_evaluator() -> TestQualityMetrics:
+    """The evaluator behind the module-level functions, built on first use"""
+    return TestQualityMetrics()
+
+@lru_cache(maxsize=256)
+def _evaluate_test_quality_cached(test_code: str, task_description: Optional[str],
+                                  source_code: Optional[str], language: Optional[str],
+                                  metrics: Optional[frozenset]) -> Dict[str, Any]:
+    """
+    Evaluate test quality, memoized on the arguments
+    
+    Every metric is a pure function of the code and descriptions, and TDD
+    iterations and retries often re-evaluate the same tests.
+    """
+    return _shared_evaluator().evaluate_test_quality(test_code, task_description, source_code, language, metrics)
+
 def evaluate_test_quality(test_code: str, task_description: str = None,
-                         source_code: str = None, language: str = None) -> Dict[str, Any]:
+                         source_code: str = None, language: str = None,
+                         metrics: Optional[Iterable[str]] = None) -> Dict[str, Any]:
     """
     Evaluate the quality of test code using various metrics.
     
@@ -878,9 +1215,37 @@ def evaluate_test_quality(test_code: str, task_description: str = None,
         task_description: Optional task description for relevance assessment
         source_code: Optional source code being tested
         language: Optional programming language for language-specific analysis
+        metrics: Optional result keys to compute, e.g. ["overall_quality"];
+            defaults to every key
         
     Returns:
         Dictionary containing test quality metrics
     """
-    evaluator = TestQualityMetrics()
-    return evaluator.evaluate_test_quality(test_code, task_description, source_code, language)
+    if metrics is not None:
+        metrics = frozenset(metrics)
+    result = _evaluate_test_quality_cached(test_code, task_description, source_code, language, metrics)
+    # Callers get their own copy, so changing it can't corrupt the cached result
+    return {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
+
+def evaluate_many(test_codes: Iterable[str], task_description: str = None,
+                  source_code: str = None, language: str = None,
+                  metrics: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Evaluate the quality of several test code snippets against the same task.
+    
+    Args:
+        test_codes: The test code snippets to evaluate
+        task_description: Optional task description for relevance assessment
+        source_code: Optional source code being tested
+        language: Optional programming language; detected per snippet if omitted
+        metrics: Optional result keys to compute; defaults to every key
+        
+    Returns:
+        One evaluate_test_quality result per snippet, in order
+    """
+    if metrics is not None:
+        metrics = frozenset(metrics)
+    return [
+        evaluate_test_quality(test_code, task_description, source_code, language, metrics)
+        for test_code in test_codes
+    ]
@@ -9,45 +9,86 @@ with real-time updates.
 """
 import os
 import json
+import logging
+import time
+import atexit
+import threading
+from collections import deque
 from datetime import datetime
 from typing import Dict, List, Any
 
+# orjson is optional: it serializes the logs file several times faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
 # Path to log file
 LOG_FILE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mcp_logs.json")
 
-# Global logs storage
-communication_logs_data = []
+# Global logs storage; the deque drops the oldest entry once MAX_LOGS is reached
 MAX_LOGS = 200
+communication_logs_data = deque(maxlen=MAX_LOGS)
+
+# Logs may be added from worker threads as well as the event loop
+_logs_lock = threading.Lock()
+
+# Serializes writes of the logs file; when both are needed, _logs_lock is taken first
+_save_lock = threading.Lock()
+
+# Emoticons shown for each message type
+_INCOMING_EMOTICONS = {
+    "suggestion": "💡",  # Incoming suggestion
+    "continue": "⏩",  # Continue request
+    "tdd_request": "🧪",  # TDD request
+}
+_OUTGOING_EMOTICONS = {
+    "continuation": "🔄",  # Continuation response
+    "error": "⚠️",  # Error response
+    "tdd_tests": "🧪",  # TDD tests
+}
+
+# Seconds to wait before writing new logs to the file, so a burst of
+# messages is written once rather than once per message
+SAVE_DELAY = 0.5
+_save_timer = None
+
+# (mtime, size) of the logs file when it was last loaded
+_loaded_file_stat = None
+
+# Serialized form of the logs for /api/logs; None once the logs change
+_logs_json = None
+
+# (second, formatted date and time) of the latest log timestamp; one tuple,
+# so threads never see a second paired with another second's text
+_timestamp_cache = (None, "")
+
+def _log_timestamp() -> str:
+    """Format the current local time as YYYY-mm-dd HH:MM:SS.mmm"""
+    global _timestamp_cache
+    ns = time.time_ns()
+    second = ns // 1_000_000_000
+    cached_second, prefix = _timestamp_cache
+    if second != cached_second:
+        # strftime only runs once per second, however many messages arrive
+        prefix = datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+        _timestamp_cache = (second, prefix)
+    return f"{prefix}.{ns // 1_000_000 % 1000:03d}"
 
 def add_to_logs(direction: str, message_type: str, content: Any):
     """Add a message to the communication logs"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    timestamp = _log_timestamp()
     
     # Determine emoticon based on message type and direction
-    emoticon = "📝"  # Default
     if direction == "incoming":
-        if message_type == "suggestion":
-            emoticon = "💡"  # Incoming suggestion
-        elif message_type == "continue":
-            emoticon = "⏩"  # Continue request
-        elif message_type == "tdd_request":
-            emoticon = "🧪"  # TDD request
-        else:
-            emoticon = "📥"  # Other incoming
-    else:  # outgoing
-        if message_type == "evaluation":
-            if isinstance(content, dict) and content.get("accept", False):
-                emoticon = "✅"  # Accepted evaluation
-            else:
-                emoticon = "❌"  # Rejected evaluation
-        elif message_type == "continuation":
-            emoticon = "🔄"  # Continuation response
-        elif message_type == "error":
-            emoticon = "⚠️"  # Error response
-        elif message_type == "tdd_tests":
-            emoticon = "🧪"  # TDD tests
-        else:
-            emoticon = "📤"  # Other outgoing
+        emoticon = _INCOMING_EMOTICONS.get(message_type, "📥")  # Other incoming
+    elif message_type == "evaluation":
+        # Accepted or rejected evaluation
+        emoticon = "✅" if isinstance(content, dict) and content.get("accept", False) else "❌"
+    else:
+        emoticon = _OUTGOING_EMOTICONS.get(message_type, "📤")  # Other outgoing
     
     # Add log entry
     log_entry = {
@@ -59,49 +100,126 @@ def add_to_logs(direction: str, message_type: str, content: Any):
     }
     
     # Add to global logs with limit
-    global communication_logs_data
-    communication_logs_data.append(log_entry)
-    if len(communication_logs_data) > MAX_LOGS:
-        communication_logs_data.pop(0)  # Remove oldest entry
-    
-    # Save logs to file for persistence
-    save_logs_to_file()
+    global _logs_json
+    with _logs_lock:
+        communication_logs_data.append(log_entry)
+        _logs_json = None
+        
+        # Save logs to file for persistence, off the caller's thread
+        _schedule_save()
+
+def _schedule_save():
+    """Write the logs file after SAVE_DELAY unless a write is already scheduled (call with _logs_lock held)"""
+    global _save_timer
+    if _save_timer is None:
+        _save_timer = threading.Timer(SAVE_DELAY, _flush_logs)
+        _save_timer.daemon = True
+        _save_timer.start()
+
+@atexit.register
+def _flush_logs():
+    """Write a scheduled logs file update now"""
+    global _save_timer
+    with _logs_lock:
+        if _save_timer is None:
+            return
+        _save_timer.cancel()
+        _save_timer = None
+        logs = list(communication_logs_data)
+        # Taken before the logs lock is released, so writes land in snapshot order
+        _save_lock.acquire()
+    # Encoding and writing happen outside the logs lock, so add_to_logs
+    # callers (including the event loop) don't wait for the disk
+    try:
+        _write_logs_file(logs)
+    finally:
+        _save_lock.release()
 
 def communication_logs():
     """Return all communication logs"""
-    global communication_logs_data
-    return communication_logs_data
+    with _logs_lock:
+        return list(communication_logs_data)
+
+def communication_logs_count() -> int:
+    """Return the number of communication logs without copying them"""
+    return len(communication_logs_data)
+
+def communication_logs_json() -> bytes:
+    """Return all communication logs as JSON, serializing them only after a change"""
+    global _logs_json
+    with _logs_lock:
+        if _logs_json is None:
+            if orjson is not None:
+                _logs_json = orjson.dumps(list(communication_logs_data), option=orjson.OPT_NON_STR_KEYS)
+            else:
+                _logs_json = json.dumps(list(communication_logs_data), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return _logs_json
 
 def clear_logs():
     """Clear all logs"""
-    global communication_logs_data
-    communication_logs_data = []
-    save_logs_to_file()
+    global _logs_json
+    with _logs_lock:
+        communication_logs_data.clear()
+        _logs_json = None
+        save_logs_to_file()
 
 def save_logs_to_file():
     """Save communication logs to file"""
+    with _save_lock:
+        _write_logs_file(list(communication_logs_data))
+
+def _write_logs_file(logs: List[Dict[str, Any]]):
+    """Write a snapshot of the logs to the logs file"""
     try:
-        with open(LOG_FILE_PATH, 'w') as f:
-            json.dump(communication_logs_data, f, indent=2)
+        if orjson is not None:
+            with open(LOG_FILE_PATH, 'wb') as f:
+                f.write(orjson.dumps(logs, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            # json.dump writes iterencode chunks as they are produced, so the
+            # whole document is never held in memory at once
+            with open(LOG_FILE_PATH, 'w') as f:
+                json.dump(logs, f, indent=2)
     except Exception as e:
-        print(f"Error saving logs to file: {e}")
+        logger.error(f"Error saving logs to file: {e}")
 
 def load_logs_from_file():
     """Load communication logs from file"""
-    global communication_logs_data
+    global communication_logs_data, _loaded_file_stat, _logs_json
     try:
-        if os.path.exists(LOG_FILE_PATH):
-            with open(LOG_FILE_PATH, 'r') as f:
-                loaded_logs = json.load(f)
-                if isinstance(loaded_logs, list):
-                    communication_logs_data = loaded_logs
-                    print(f"Loaded {len(communication_logs_data)} logs from file")
+        # The web server reloads on every poll; skip parsing if the file is unchanged
+        stat = os.stat(LOG_FILE_PATH)
+        file_stat = (stat.st_mtime_ns, stat.st_size)
+        if file_stat == _loaded_file_stat:
+            return
+        # Read bytes: orjson writes raw UTF-8, which json.loads also decodes
+        with open(LOG_FILE_PATH, 'rb') as f:
+            data = f.read()
+        loaded_logs = orjson.loads(data) if orjson is not None else json.loads(data)
+        if isinstance(loaded_logs, list):
+            communication_logs_data = deque(loaded_logs, maxlen=MAX_LOGS)
+            _loaded_file_stat = file_stat
+            _logs_json = None
+            logger.debug(f"Loaded {len(communication_logs_data)} logs from file")
+    except FileNotFoundError:
+        # Nothing has been logged yet
+        pass
     except Exception as e:
-        print(f"Error loading logs from file: {e}")
+        logger.error(f"Error loading logs from file: {e}")
 
-def get_html_interface():
-    """Generate HTML for the MCP server web interface"""
-    html = """
+def _strip_indentation(html: str) -> str:
+    """
+    Remove indentation and blank lines from the interface HTML
+    
+    Line breaks are kept, so JavaScript line comments and automatic
+    semicolon insertion are unaffected; the only <pre> holds its content
+    on a single line
+    """
+    return "\n".join(line.strip() for line in html.splitlines() if line.strip())
+
+# HTML for the MCP server web interface. It is static, so it is also kept
+# encoded once for the HTTP handlers. Indentation is stripped at import:
+# it is about 40% of the bytes and the browser ignores it
+_HTML_INTERFACE = """
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -372,7 +490,8 @@ def get_html_interface():
             // State management
             let autoRefreshEnabled = true;
             let refreshInterval;
-            let lastLogCount = 0;
+            let lastTimestamp = '';
+            let lastTimestampCount = 0;
             let isFirstLoad = true;
             
             // DOM elements
@@ -397,10 +516,34 @@ def get_html_interface():
                 // Initial fetch
                 fetchLogs();
                 
-                // Start auto-refresh
+                // Start auto-refresh; polling only runs while the push connection is down
                 startAutoRefresh();
+                connectLogSocket();
             });
             
+            // Receive log updates pushed by the server instead of polling
+            function connectLogSocket() {
+                const socket = new WebSocket(location.origin.replace(/^http/, 'ws') + '/ws/logs');
+                socket.binaryType = 'arraybuffer';
+                
+                socket.onopen = () => {
+                    clearInterval(refreshInterval);
+                    refreshInterval = null;
+                };
+                socket.onmessage = (event) => {
+                    if (autoRefreshEnabled) {
+                        showLogs(JSON.parse(new TextDecoder().decode(event.data)));
+                    }
+                };
+                socket.onclose = () => {
+                    // Fall back to polling and try to reconnect
+                    if (!refreshInterval) {
+                        startAutoRefresh();
+                    }
+                    setTimeout(connectLogSocket, 5000);
+                };
+            }
+            
             // Auto-refresh logic
             function startAutoRefresh() {
                 // Clear any existing interval
@@ -456,7 +599,6 @@ def get_html_interface():
                     return response.json();
                 })
                 .then(() => {
-                    lastLogCount = 0;
                     fetchLogs();
                 })
                 .catch(error => {
@@ -479,81 +621,97 @@ def get_html_interface():
                         }
                         return response.json();
                     })
-                    .then(data => {
-                        // Check if we have new data before updating
-                        const hasNewLogs = data.length !== lastLogCount;
-                        lastLogCount = data.length;
-                        
-                        // Update logs display if there are changes or first load
-                        if (hasNewLogs || isFirstLoad) {
-                            updateLogDisplay(data);
-                            isFirstLoad = false;
-                        }
-                        
-                        // Update timestamp
-                        updateLastUpdatedTime();
-                        
-                        // Scroll to bottom for new logs (only if auto-refresh and new logs)
-                        if (hasNewLogs && autoRefreshEnabled && !isFirstLoad) {
-                            logsContainer.scrollTop = logsContainer.scrollHeight;
-                        }
-                        
-                        return data;
-                    })
+                    .then(showLogs)
                     .catch(error => {
                         console.error('Error fetching logs:', error);
                     });
             }
             
-            // Update the log display with data
-            function updateLogDisplay(logs) {
-                // Update log count
-                logCountElement.textContent = `${logs.length} entries`;
+            // Show logs fetched or pushed from the server
+            function showLogs(data) {
+                // Logs only grow at the end (dropping the oldest), so entries
+                // after the newest one already shown are the new ones. Entries
+                // can share a millisecond timestamp, so count those as well
+                const replaceAll = isFirstLoad || data.length === 0 || data[0].timestamp > lastTimestamp;
+                let start = 0;
+                if (!replaceAll) {
+                    start = data.length;
+                    let sameCount = 0;
+                    while (start > 0 && data[start - 1].timestamp >= lastTimestamp) {
+                        if (data[start - 1].timestamp === lastTimestamp) {
+                            sameCount++;
+                        }
+                        start--;
+                    }
+                    start += Math.min(sameCount, lastTimestampCount);
+                }
+                const newLogs = data.slice(start);
+                const hasNewLogs = newLogs.length > 0;
                 
-                // Show/hide empty message
-                if (logs.length === 0) {
-                    emptyLogsMessage.style.display = 'block';
-                    logsContainer.innerHTML = '';
-                    return;
-                } else {
-                    emptyLogsMessage.style.display = 'none';
+                // Only the new entries are turned into DOM nodes
+                const newContent = newLogs.map(renderLogEntry).join('');
+                if (replaceAll) {
+                    logsContainer.innerHTML = newContent;
+                } else if (hasNewLogs) {
+                    logsContainer.insertAdjacentHTML('beforeend', newContent);
                 }
+                // Drop entries that fell out of the server's bounded log
+                while (logsContainer.children.length > data.length) {
+                    logsContainer.firstElementChild.remove();
+                }
+                isFirstLoad = false;
                 
-                // Build HTML for logs
-                let logContent = '';
+                // Remember the newest entry shown
+                lastTimestamp = data.length ? data[data.length - 1].timestamp : '';
+                lastTimestampCount = 0;
+                for (let i = data.length - 1; i >= 0 && data[i].timestamp === lastTimestamp; i--) {
+                    lastTimestampCount++;
+                }
                 
-                logs.forEach(log => {
-                    const directionClass = log.direction === 'incoming' ? 'incoming' : 
-                                        (log.message_type === 'error' ? 'error' : 'outgoing');
-                    
-                    // Format content as JSON with indentation
-                    let formattedContent;
-                    if (typeof log.content === 'object') {
-                        try {
-                            formattedContent = JSON.stringify(log.content, null, 2);
-                        } catch (e) {
-                            formattedContent = 'Error displaying content: ' + e.message;
-                        }
-                    } else {
-                        formattedContent = log.content || '';
+                // Update log count and show/hide empty message
+                logCountElement.textContent = `${data.length} entries`;
+                emptyLogsMessage.style.display = data.length === 0 ? 'block' : 'none';
+                
+                // Update timestamp
+                updateLastUpdatedTime();
+                
+                // Scroll to bottom for new logs (only if auto-refresh and new logs)
+                if (hasNewLogs && autoRefreshEnabled) {
+                    logsContainer.scrollTop = logsContainer.scrollHeight;
+                }
+                
+                return data;
+            }
+            
+            // Build the HTML for one log entry
+            function renderLogEntry(log) {
+                const directionClass = log.direction === 'incoming' ? 'incoming' : 
+                                    (log.message_type === 'error' ? 'error' : 'outgoing');
+                
+                // Format content as JSON with indentation
+                let formattedContent;
+                if (typeof log.content === 'object') {
+                    try {
+                        formattedContent = JSON.stringify(log.content, null, 2);
+                    } catch (e) {
+                        formattedContent = 'Error displaying content: ' + e.message;
                     }
-                    
-                    logContent += `
-                        <div class="log-entry ${directionClass}">
-                            <div class="log-time">${log.timestamp}</div>
-                            <div class="log-emoticon">${log.emoticon}</div>
-                            <div class="log-content">
-                                <div class="log-type">
-                                    <span>${log.direction.toUpperCase()}: ${log.message_type}</span>
-                                </div>
-                                <pre class="log-message">${formattedContent}</pre>
+                } else {
+                    formattedContent = log.content || '';
+                }
+                
+                return `
+                    <div class="log-entry ${directionClass}">
+                        <div class="log-time">${log.timestamp}</div>
+                        <div class="log-emoticon">${log.emoticon}</div>
+                        <div class="log-content">
+                            <div class="log-type">
+                                <span>${log.direction.toUpperCase()}: ${log.message_type}</span>
                             </div>
+                            <pre class="log-message">${formattedContent}</pre>
                         </div>
-                    `;
-                });
-                
-                // Update the container
-                logsContainer.innerHTML = logContent;
+                    </div>
+                `;
             }
             
             // Update the "last updated" timestamp
@@ -568,4 +726,13 @@ def get_html_interface():
     </body>
     </html>
     """
-    return html
+_HTML_INTERFACE = _strip_indentation(_HTML_INTERFACE)
+_HTML_INTERFACE_BYTES = _HTML_INTERFACE.encode("utf-8")
+
+def get_html_interface():
+    """Return the HTML for the MCP server web interface"""
+    return _HTML_INTERFACE
+
+def get_html_interface_bytes() -> bytes:
+    """Return the HTML for the MCP server web interface, encoded as UTF-8"""
+    return _HTML_INTERFACE_BYTES
@@ -9,13 +9,23 @@ A simplified, reliable web server that provides real-time access to MCP communic
 This server runs on a separate port from the main MCP server to avoid protocol interference.
 """
 import os
+import gzip
+import hashlib
 import sys
+import asyncio
 import logging
 import uvicorn
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from typing import Set
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+# orjson is optional: when installed, JSON endpoints are encoded with it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, 
@@ -26,8 +36,9 @@ logger = logging.getLogger(__name__)
 # Ensure we can import from the current directory
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.web_interface import (
-    get_html_interface, 
-    communication_logs, 
+    get_html_interface_bytes, 
+    communication_logs_count, 
+    communication_logs_json, 
     load_logs_from_file, 
     clear_logs
 )
@@ -36,9 +47,26 @@ from src.web_interface import (
 app = FastAPI(
     title="MCP Server - Real-time Logs",
     description="Web interface for monitoring MCP communication in real-time",
-    version="0.5.0"
+    version="0.5.0",
+    default_response_class=ORJSONResponse if orjson else JSONResponse
 )
 
+# The interface HTML is static, so browsers may cache it and revalidate by
+# ETag. It is also gzipped once here for browsers that accept it; each
+# encoding gets its own ETag
+_HTML_ETAG = hashlib.sha256(get_html_interface_bytes()).hexdigest()[:32]
+_HTML_GZIP = gzip.compress(get_html_interface_bytes(), compresslevel=9)
+_HTML_HEADERS = {
+    "Cache-Control": "public, max-age=60",
+    "Vary": "Accept-Encoding",
+    "ETag": f'"{_HTML_ETAG}"',
+}
+_HTML_GZIP_HEADERS = {
+    **_HTML_HEADERS,
+    "Content-Encoding": "gzip",
+    "ETag": f'"{_HTML_ETAG}-gzip"',
+}
+
 # Add CORS middleware to allow requests from any origin
 app.add_middleware(
     CORSMiddleware,
@@ -51,33 +79,90 @@ app.add_middleware(
 @app.get("/", response_class=HTMLResponse)
 async def get_root(request: Request):
     """Return the HTML web interface"""
-    return HTMLResponse(content=get_html_interface())
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        content, headers = _HTML_GZIP, _HTML_GZIP_HEADERS
+    else:
+        # Pre-encoded, so the response is not re-encoded on every request
+        content, headers = get_html_interface_bytes(), _HTML_HEADERS
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        # Content-Encoding belongs to a body, which a 304 doesn't have
+        return Response(status_code=304, headers=_HTML_HEADERS | {"ETag": headers["ETag"]})
+    return HTMLResponse(content=content, headers=headers)
 
 @app.get("/api/logs")
 async def get_logs():
     """
     Return the communication logs
     
-    Loads fresh logs from file each time to ensure real-time updates
+    Picks up logs written by the MCP server process; the file is only
+    re-read when its mtime or size changed
     """
-    # Always load fresh logs from file to ensure we have the latest data
+    # Reload the logs if the file changed since the last request
     load_logs_from_file()
     
-    # Return the logs as JSON
-    return JSONResponse(content=communication_logs())
+    # Return the logs as JSON, serialized once per change rather than per poll
+    return Response(content=communication_logs_json(), media_type="application/json")
+
+# Browsers subscribed to log updates, and the task pushing updates to them
+log_subscribers: Set[WebSocket] = set()
+_log_watch_task = None
+
+# Seconds between checks of the logs file while anyone is subscribed
+LOG_WATCH_INTERVAL = 0.5
+
+async def watch_logs():
+    """Push the logs to every subscriber whenever the logs file changes"""
+    last_sent = communication_logs_json()
+    while log_subscribers:
+        await asyncio.sleep(LOG_WATCH_INTERVAL)
+        # One reload and one serialization serve every subscriber
+        load_logs_from_file()
+        payload = communication_logs_json()
+        if payload is last_sent:
+            continue
+        last_sent = payload
+        for websocket in list(log_subscribers):
+            try:
+                await websocket.send_bytes(payload)
+            except Exception:
+                log_subscribers.discard(websocket)
+
+@app.websocket("/ws/logs")
+async def logs_websocket(websocket: WebSocket):
+    """
+    Push the communication logs to the browser as they change
+    
+    Replaces polling /api/logs: a single watcher checks the logs file for
+    all connected browsers and only sends when something changed
+    """
+    global _log_watch_task
+    await websocket.accept()
+    load_logs_from_file()
+    await websocket.send_bytes(communication_logs_json())
+    log_subscribers.add(websocket)
+    if _log_watch_task is None or _log_watch_task.done():
+        _log_watch_task = asyncio.create_task(watch_logs())
+    try:
+        # Nothing is expected from the browser; this waits for it to disconnect
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        log_subscribers.discard(websocket)
 
 @app.post("/api/logs/clear")
 async def clear_all_logs():
     """Clear all communication logs"""
     clear_logs()
-    return JSONResponse(content={"status": "success", "message": "Logs cleared"})
+    return {"status": "success", "message": "Logs cleared"}
 
 @app.get("/api/status")
 async def get_status():
     """Status endpoint with basic server information"""
     return {
         "status": "running",
-        "log_count": len(communication_logs()),
+        "log_count": communication_logs_count(),
         "server": "MCP Web Interface"
     }
 
@@ -94,7 +179,7 @@ def run_server(host: str = "0.0.0.0", port: int = 5002):
     load_logs_from_file()
     
     # Log startup information
-    log_count = len(communication_logs())
+    log_count = communication_logs_count()
     logger.info(f"Starting web interface server on {host}:{port}")
     logger.info(f"Web interface will be available at http://localhost:{port}")
     logger.info(f"Loaded {log_count} existing log entries")
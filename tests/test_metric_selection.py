@@ -0,0 +1,98 @@
+
+# Test metric selection and batch evaluation in the test quality metrics
+import pytest
+import os
+import sys
+
+# Ensure the repository root is in the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import src.test_quality_metrics as quality_metrics
+
+TASK = "Implement an add function that handles negative numbers"
+
+PYTHON_TESTS = '''
+import pytest
+from calc import add
+
+@pytest.fixture
+def numbers():
+    return [1, 2, 3]
+
+def test_add_positive(numbers):
+    assert add(numbers[0], numbers[1]) == 3
+
+def test_add_negative():
+    assert add(-1, -2) == -3
+
+@pytest.mark.parametrize("a,b,expected", [(0, 0, 0), (1, -1, 0)])
+def test_add_boundary(a, b, expected):
+    assert add(a, b) == expected
+
+def test_add_invalid():
+    with pytest.raises(TypeError):
+        add(None, 1)
+'''
+
+JS_TESTS = '''
+const { add } = require('./calc');
+
+describe('add', () => {
+    test('adds two numbers', () => {
+        expect(add(1, 2)).toBe(3);
+    });
+    test('handles null', () => {
+        expect(() => add(null, 1)).toThrow();
+    });
+});
+'''
+
+SUBSETS = [
+    ["overall_quality"],
+    ["edge_case_score", "test_count"],
+    ["assertion_density", "normalized_assertion_density", "assertion_count"],
+    ["detected_language"],
+    ["strengths", "weaknesses"],
+    ["task_alignment_score", "readability_score", "test_isolation_score"],
+]
+
+@pytest.mark.parametrize("test_code", [PYTHON_TESTS, JS_TESTS, "x = 1"])
+@pytest.mark.parametrize("subset", SUBSETS)
+def test_subset_matches_full_result(test_code, subset):
+    full = quality_metrics.evaluate_test_quality(test_code, TASK)
+    partial = quality_metrics.evaluate_test_quality(test_code, TASK, metrics=subset)
+    assert partial == {key: full[key] for key in subset if key in full}
+
+@pytest.mark.parametrize("subset", SUBSETS)
+def test_evaluator_subset_matches_full_result(subset):
+    evaluator = quality_metrics.TestQualityMetrics()
+    full = evaluator.evaluate_test_quality(PYTHON_TESTS, TASK, language="python")
+    partial = evaluator.evaluate_test_quality(PYTHON_TESTS, TASK, language="python", metrics=subset)
+    assert partial == {key: full[key] for key in subset}
+
+def test_unknown_metric_raises():
+    with pytest.raises(ValueError, match="no_such_metric"):
+        quality_metrics.evaluate_test_quality(PYTHON_TESTS, TASK, metrics=["overall_quality", "no_such_metric"])
+    with pytest.raises(ValueError, match="no_such_metric"):
+        quality_metrics.TestQualityMetrics().evaluate_test_quality(PYTHON_TESTS, metrics=["no_such_metric"])
+    with pytest.raises(ValueError, match="no_such_metric"):
+        quality_metrics.evaluate_many([PYTHON_TESTS], metrics=["no_such_metric"])
+
+def test_evaluate_many_matches_single_evaluations():
+    test_codes = [PYTHON_TESTS, JS_TESTS, PYTHON_TESTS]
+    expected = [quality_metrics.evaluate_test_quality(code, TASK) for code in test_codes]
+    assert quality_metrics.evaluate_many(test_codes, TASK) == expected
+    assert quality_metrics.TestQualityMetrics().evaluate_many(iter(test_codes), TASK) == expected
+
+def test_evaluate_many_with_metrics():
+    results = quality_metrics.evaluate_many([PYTHON_TESTS, JS_TESTS], TASK, metrics=iter(["overall_quality"]))
+    assert results == [
+        {"overall_quality": quality_metrics.evaluate_test_quality(code, TASK)["overall_quality"]}
+        for code in (PYTHON_TESTS, JS_TESTS)
+    ]
+    assert quality_metrics.evaluate_many([], TASK) == []
+
+def test_results_are_independent_copies():
+    first = quality_metrics.evaluate_test_quality(PYTHON_TESTS, TASK)
+    first["strengths"].append("changed by caller")
+    second = quality_metrics.evaluate_test_quality(PYTHON_TESTS, TASK)
+    assert "changed by caller" not in second["strengths"]
@@ -0,0 +1,206 @@
+
+# Test the persistent pytest worker and the runner processes that drive it
+import pytest
+import os
+import sys
+import threading
+import subprocess
+import types
+
+# Ensure the repository root is in the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.pytest_worker import run_job
+from src.test_execution import PersistentTestRunner, PersistentRunnerPool, PYTEST_WORKER_PATH
+
+WORKER_ARGV = [sys.executable, "-u", PYTEST_WORKER_PATH]
+
+def make_job(work_dir, source, name="test_job.py"):
+    test_file = work_dir / name
+    test_file.write_text(source)
+    return {"test_file": str(test_file), "work_dir": str(work_dir)}
+
+@pytest.fixture
+def worker_dir(tmp_path):
+    # The first in-process job sets some of pytest's module globals for good;
+    # run one up front so it isn't mistaken for a job that changed global state
+    warm_up = tmp_path / "warm_up"
+    warm_up.mkdir()
+    run_job(make_job(warm_up, "def test_warm_up(): pass\n"))
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+    return work_dir
+
+@pytest.fixture
+def runner():
+    runner = PersistentTestRunner(WORKER_ARGV)
+    yield runner
+    runner.close()
+
+def test_pass_fail_counts(worker_dir):
+    result = run_job(make_job(worker_dir, """
+def test_one(): pass
+def test_two(): pass
+def test_three(): assert False
+"""))
+    assert result["exit_code"] == 1
+    assert (result["passed"], result["failed"], result["errors"]) == (2, 1, 0)
+    assert "test_three" in result["output"]
+    assert result["recycle"] is False
+
+def test_setup_and_teardown_errors_count_once_per_test(worker_dir):
+    result = run_job(make_job(worker_dir, """
+import pytest
+
+@pytest.fixture
+def broken_teardown():
+    yield
+    raise RuntimeError("teardown")
+
+@pytest.fixture
+def broken_setup():
+    raise RuntimeError("setup")
+
+def test_teardown_fails(broken_teardown): pass
+def test_setup_fails(broken_setup): pass
+def test_passes(): pass
+"""))
+    assert (result["passed"], result["failed"], result["errors"]) == (1, 2, 0)
+
+def test_collection_errors_are_not_tests(worker_dir):
+    result = run_job(make_job(worker_dir, "import module_that_does_not_exist\n"))
+    assert (result["passed"], result["failed"], result["errors"]) == (0, 0, 1)
+
+def test_job_environment_is_restored(worker_dir, monkeypatch):
+    monkeypatch.setenv("AIDM_WORKER_KEEP", "1")
+    monkeypatch.delenv("AIDM_WORKER_LEAK", raising=False)
+    cwd, path = os.getcwd(), list(sys.path)
+    result = run_job(make_job(worker_dir, """
+import os
+def test_changes_environment():
+    os.environ["AIDM_WORKER_LEAK"] = "1"
+    del os.environ["AIDM_WORKER_KEEP"]
+"""))
+    assert result["passed"] == 1
+    assert "AIDM_WORKER_LEAK" not in os.environ
+    assert os.environ["AIDM_WORKER_KEEP"] == "1"
+    assert os.getcwd() == cwd
+    assert sys.path == path
+
+def test_work_dir_modules_are_purged_between_jobs(worker_dir, tmp_path):
+    (worker_dir / "calc.py").write_text("def value(): return 1\n")
+    first = run_job(make_job(worker_dir, "from calc import value\ndef test_value(): assert value() == 1\n"))
+    assert first["passed"] == 1
+    assert "calc" not in sys.modules
+
+    other_dir = tmp_path / "other"
+    other_dir.mkdir()
+    (other_dir / "calc.py").write_text("def value(): return 2\n")
+    second = run_job(make_job(other_dir, "from calc import value\ndef test_value(): assert value() == 2\n"))
+    assert second["passed"] == 1
+
+def test_rebound_module_global_requests_recycle(worker_dir, monkeypatch):
+    probe = types.ModuleType("aidm_worker_probe")
+    probe.value = 1
+    monkeypatch.setitem(sys.modules, "aidm_worker_probe", probe)
+    result = run_job(make_job(worker_dir, """
+import aidm_worker_probe
+def test_rebinds_global():
+    aidm_worker_probe.value = 2
+"""))
+    assert result["passed"] == 1
+    assert result["recycle"] is True
+
+def test_runner_isolates_jobs(runner, tmp_path):
+    (tmp_path / "first").mkdir()
+    (tmp_path / "second").mkdir()
+    first = runner.run(make_job(tmp_path / "first", """
+import os
+def test_leak(): os.environ["AIDM_WORKER_LEAK"] = "1"
+"""), timeout=30)
+    process = runner.process
+    second = runner.run(make_job(tmp_path / "second", """
+import os
+def test_no_leak(): assert "AIDM_WORKER_LEAK" not in os.environ
+"""), timeout=30)
+    assert first["passed"] == 1 and second["passed"] == 1
+    # Nothing needed recycling, so the same warm process ran both jobs
+    assert runner.process is process
+
+def test_runner_recycles_after_patched_json(runner, tmp_path):
+    (tmp_path / "patch").mkdir()
+    (tmp_path / "check").mkdir()
+    result = runner.run(make_job(tmp_path / "patch", """
+import json
+json.dumps = lambda *args, **kwargs: "HIJACK"
+def test_patched(): pass
+"""), timeout=30)
+    assert result["passed"] == 1
+    assert "recycle" not in result
+    assert runner.process is None
+    result = runner.run(make_job(tmp_path / "check", """
+import json
+def test_json(): assert json.dumps(1) == "1"
+"""), timeout=30)
+    assert result["passed"] == 1
+
+def test_runner_timeout_kills_worker(runner, tmp_path):
+    job = make_job(tmp_path, "import time\ndef test_slow(): time.sleep(30)\n")
+    with pytest.raises(subprocess.TimeoutExpired):
+        runner.run(job, timeout=0.5)
+    assert runner.process is None
+
+def test_runner_restarts_after_crash(runner, tmp_path):
+    (tmp_path / "crash").mkdir()
+    (tmp_path / "after").mkdir()
+    with pytest.raises(RuntimeError, match="exited unexpectedly"):
+        runner.run(make_job(tmp_path / "crash", "import os\ndef test_crash(): os._exit(1)\n"), timeout=30)
+    result = runner.run(make_job(tmp_path / "after", "def test_ok(): pass\n"), timeout=30)
+    assert result["passed"] == 1
+
+def test_runner_rejects_bad_response(tmp_path):
+    runner = PersistentTestRunner([sys.executable, "-c", "import sys; sys.stdin.readline(); print('not json', flush=True)"])
+    try:
+        with pytest.raises(RuntimeError, match="Invalid response"):
+            runner.run({"test_file": "test_job.py", "work_dir": str(tmp_path)}, timeout=30)
+        assert runner.process is None
+    finally:
+        runner.close()
+
+def test_runner_reports_start_failure(tmp_path):
+    runner = PersistentTestRunner([str(tmp_path / "no_such_executable")])
+    with pytest.raises(RuntimeError, match="not available"):
+        runner.run({"test_file": "test_job.py", "work_dir": str(tmp_path)}, timeout=30)
+    assert runner.process is None
+
+def test_pool_reuses_idle_runner():
+    pool = PersistentRunnerPool(WORKER_ARGV, size=2)
+    with pool.checkout() as first:
+        pass
+    with pool.checkout() as second:
+        pass
+    assert first is second
+    pool.close()
+
+def test_pool_gives_concurrent_jobs_separate_runners():
+    pool = PersistentRunnerPool(WORKER_ARGV, size=2)
+    with pool.checkout() as first, pool.checkout() as second:
+        assert first is not second
+    pool.close()
+
+def test_pool_waits_when_full():
+    pool = PersistentRunnerPool(WORKER_ARGV, size=1)
+    checked_out = threading.Event()
+    borrowed = []
+
+    def borrow():
+        with pool.checkout() as runner:
+            borrowed.append(runner)
+        checked_out.set()
+
+    with pool.checkout() as runner:
+        thread = threading.Thread(target=borrow)
+        thread.start()
+        assert not checked_out.wait(0.2)
+    thread.join(5)
+    assert borrowed == [runner]
+    pool.close()
@@ -0,0 +1,91 @@
+
+# Test the LLM call limits in the TDD helpers
+import pytest
+import os
+import sys
+import time
+import asyncio
+import threading
+import concurrent.futures
+
+# Ensure the repository root is in the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import src.tdd_helpers as tdd_helpers
+
+class StallingAgent:
+    """Fake agent whose first call stalls well past the LLM timeout"""
+
+    def __init__(self, stall):
+        self.stall = stall
+        self.calls = 0
+        self.stream_stopped = threading.Event()
+
+    def send_prompt_to_llm(self, prompt):
+        self.calls += 1
+        if self.calls == 1:
+            time.sleep(self.stall)
+        return {"response": f"reply to {prompt}"}
+
+    def stream_prompt_to_llm(self, prompt, on_chunk):
+        # Like the real agent, errors raised by on_chunk end the stream
+        self.calls += 1
+        try:
+            deadline = time.monotonic() + (self.stall if self.calls == 1 else 0)
+            while True:
+                on_chunk("chunk ")
+                if time.monotonic() >= deadline:
+                    return {"response": f"reply to {prompt}"}
+                time.sleep(0.02)
+        except Exception as e:
+            self.stream_stopped.set()
+            return {"error": str(e)}
+
+class FakeWebSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_bytes(self, data):
+        self.frames.append(data)
+
+@pytest.fixture
+def single_worker(monkeypatch):
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(tdd_helpers, "_LLM_EXECUTOR", executor)
+    monkeypatch.setattr(tdd_helpers, "LLM_TIMEOUT", 0.3)
+    yield
+    executor.shutdown(wait=True)
+
+async def run_with_one_slot(calls):
+    # The semaphore binds to the running loop, so create it inside it
+    tdd_helpers.llm_semaphore = asyncio.Semaphore(1)
+    return await calls()
+
+def test_stalled_call_keeps_its_slot_until_it_returns(single_worker, monkeypatch):
+    agent = StallingAgent(stall=0.8)
+    monkeypatch.setattr(tdd_helpers, "llm_semaphore", None)
+
+    async def calls():
+        with pytest.raises(asyncio.TimeoutError):
+            await tdd_helpers.call_llm(agent.send_prompt_to_llm, "first")
+        # The stalled call still occupies the only worker; waiting for it
+        # must not eat into the next request's deadline
+        return await tdd_helpers.call_llm(agent.send_prompt_to_llm, "second")
+
+    assert asyncio.run(run_with_one_slot(calls)) == {"response": "reply to second"}
+
+def test_stalled_stream_is_stopped_on_timeout(single_worker, monkeypatch):
+    agent = StallingAgent(stall=30)
+    monkeypatch.setattr(tdd_helpers, "agent", agent)
+    monkeypatch.setattr(tdd_helpers, "llm_semaphore", None)
+    websocket = FakeWebSocket()
+
+    async def calls():
+        with pytest.raises(asyncio.TimeoutError):
+            await tdd_helpers.stream_tests_from_llm("first", websocket, {}, 1)
+        return await tdd_helpers.stream_tests_from_llm("second", websocket, {}, 1)
+
+    started = time.monotonic()
+    assert asyncio.run(run_with_one_slot(calls)) == {"response": "reply to second"}
+    assert agent.stream_stopped.is_set()
+    assert time.monotonic() - started < 5
+    assert websocket.frames
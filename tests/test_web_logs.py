@@ -0,0 +1,100 @@
+
+# Test the communication logs pipeline behind the web interface
+import pytest
+import os
+import sys
+import json
+import time
+
+# Ensure the repository root is in the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import src.web_interface as web_interface
+
+@pytest.fixture
+def logs_file(tmp_path, monkeypatch):
+    path = tmp_path / "mcp_logs.json"
+    monkeypatch.setattr(web_interface, "LOG_FILE_PATH", str(path))
+    monkeypatch.setattr(web_interface, "SAVE_DELAY", 0.2)
+    monkeypatch.setattr(web_interface, "_loaded_file_stat", None)
+    with web_interface._logs_lock:
+        web_interface.communication_logs_data.clear()
+        web_interface._logs_json = None
+    yield path
+    # Don't leave a scheduled write behind for the next test
+    web_interface._flush_logs()
+
+@pytest.fixture
+def file_writes(monkeypatch):
+    writes = []
+    write_logs_file = web_interface._write_logs_file
+
+    def recording_write(logs):
+        writes.append(logs)
+        write_logs_file(logs)
+
+    monkeypatch.setattr(web_interface, "_write_logs_file", recording_write)
+    return writes
+
+def read_logs(path):
+    return json.loads(path.read_bytes())
+
+def test_burst_of_logs_is_written_once(logs_file, file_writes):
+    for i in range(20):
+        web_interface.add_to_logs("incoming", "suggestion", {"index": i})
+    assert file_writes == []
+    time.sleep(web_interface.SAVE_DELAY + 0.5)
+    assert len(file_writes) == 1
+    assert [entry["content"]["index"] for entry in read_logs(logs_file)] == list(range(20))
+
+def test_flush_writes_pending_logs(logs_file, file_writes):
+    web_interface.add_to_logs("outgoing", "continuation", {"index": 0})
+    web_interface._flush_logs()
+    assert len(file_writes) == 1
+    assert read_logs(logs_file)[0]["content"] == {"index": 0}
+    # Nothing is pending any more, so the scheduled write doesn't happen again
+    web_interface._flush_logs()
+    time.sleep(web_interface.SAVE_DELAY + 0.3)
+    assert len(file_writes) == 1
+
+def test_logs_json_is_cached_until_logs_change(logs_file):
+    web_interface.add_to_logs("incoming", "suggestion", {"index": 0})
+    first = web_interface.communication_logs_json()
+    assert web_interface.communication_logs_json() is first
+    assert json.loads(first)[0]["content"] == {"index": 0}
+
+    web_interface.add_to_logs("incoming", "suggestion", {"index": 1})
+    second = web_interface.communication_logs_json()
+    assert second is not first
+    assert len(json.loads(second)) == 2
+
+    web_interface.clear_logs()
+    cleared = web_interface.communication_logs_json()
+    assert cleared is not second
+    assert json.loads(cleared) == []
+
+    # Another process rewrote the file
+    logs_file.write_text(json.dumps([{"message_type": "from_file"}]))
+    web_interface.load_logs_from_file()
+    reloaded = web_interface.communication_logs_json()
+    assert reloaded is not cleared
+    assert json.loads(reloaded) == [{"message_type": "from_file"}]
+    # Reloading an unchanged file keeps the cached bytes
+    web_interface.load_logs_from_file()
+    assert web_interface.communication_logs_json() is reloaded
+
+def test_logs_websocket_sends_only_changes(logs_file, monkeypatch):
+    pytest.importorskip("fastapi.testclient")
+    pytest.importorskip("uvicorn")
+    from fastapi.testclient import TestClient
+    import src.web_server as web_server
+
+    monkeypatch.setattr(web_server, "LOG_WATCH_INTERVAL", 0.05)
+    logs_file.write_text(json.dumps([{"message_type": "initial"}]))
+    with TestClient(web_server.app) as client:
+        with client.websocket_connect("/ws/logs") as websocket:
+            assert json.loads(websocket.receive_bytes()) == [{"message_type": "initial"}]
+            # Several watch intervals pass with the file unchanged
+            time.sleep(0.3)
+            logs_file.write_text(json.dumps([{"message_type": "initial"}, {"message_type": "update"}]))
+            # So the next message is the update, not a repeat of the snapshot
+            assert json.loads(websocket.receive_bytes()) == [{"message_type": "initial"}, {"message_type": "update"}]